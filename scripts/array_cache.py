@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+
+
+class ArrayCache:
+    """
+    Thread-safe LRU of read-only numpy arrays, bounded by their total
+    nbytes. The most recent entry is always kept, even if it alone is
+    over the limit.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, array):
+        """
+        Store `array` under `key` and return the cached value (the one
+        already there if another thread got in first).
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            self._items[key] = array
+            self.nbytes += array.nbytes
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, old = self._items.popitem(last=False)
+                self.nbytes -= old.nbytes
+            return array
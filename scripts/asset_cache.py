@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import threading
+
+from .config import ASSETS_DIR, TEMP_DIR
+from .ffmpeg_tools import FFMPEG_BINARY
+from .matte_cache import file_hash
+
+ASSET_CACHE_DIR = os.path.join(TEMP_DIR, "asset_cache")
+# Evict least recently used transcodes beyond this size.
+ASSET_CACHE_MAX_BYTES = 4 * 1024 ** 3
+# Keyframe every second so trims/loops seek cheaply.
+ASSET_GOP_SECONDS = 1
+ASSET_PIX_FMT = "yuv420p"
+ASSET_CRF = 18
+
+# Layer roles whose sources are library assets rather than the clip itself.
+LIBRARY_ROLES = ("overlay", "greenscreen", "jumpscare")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _key_lock(name):
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def _cache_name(path, size, fps, crop):
+    params = json.dumps(
+        {
+            "size": [int(size[0]), int(size[1])],
+            "fps": fps,
+            "crop": [round(v, 2) for v in crop] if crop else None,
+            "pix_fmt": ASSET_PIX_FMT,
+            "crf": ASSET_CRF,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(f"{file_hash(path)}:{params}".encode("utf-8")).hexdigest()[:24]
+
+
+def _transcode(src, dst, size, fps, crop):
+    filters = []
+    if crop:
+        x1, y1, x2, y2 = crop
+        filters.append(f"crop={x2 - x1:.2f}:{y2 - y1:.2f}:{x1:.2f}:{y1:.2f}")
+    filters += [f"scale={int(size[0])}:{int(size[1])}", f"fps={fps}", f"format={ASSET_PIX_FMT}"]
+
+    cmd = [
+        FFMPEG_BINARY, "-y", "-v", "error", "-nostdin", "-i", src,
+        "-vf", ",".join(filters),
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", str(ASSET_CRF),
+        "-g", str(int(fps * ASSET_GOP_SECONDS)),
+        "-c:a", "aac", "-movflags", "+faststart",
+        dst,
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg transcode failed for {src}: {proc.stderr.decode(errors='ignore')[-300:]}")
+
+
+def prepared_asset(path, size, fps, crop=None):
+    """
+    Path to a copy of `path` cropped (source px), scaled to `size` at `fps`
+    with a short GOP, transcoding on first use. Keyed by source hash and
+    geometry; a hit refreshes the entry's LRU timestamp.
+    """
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    name = _cache_name(path, size, fps, crop)
+    cached = os.path.join(ASSET_CACHE_DIR, f"{name}.mp4")
+
+    with _key_lock(name):
+        if os.path.exists(cached):
+            os.utime(cached)
+            return cached
+
+        tmp = os.path.join(ASSET_CACHE_DIR, f"{name}.{os.getpid()}.tmp.mp4")
+        _transcode(path, tmp, size, fps, crop)
+        os.replace(tmp, cached)
+        print(f"[ASSETS] Prepared {os.path.basename(path)} at {int(size[0])}x{int(size[1])}@{fps} -> {cached}")
+
+    evict()
+    return cached
+
+
+def evict(max_bytes=None):
+    """
+    Delete least recently used transcodes until the cache fits max_bytes.
+    Returns the number of bytes freed.
+    """
+    max_bytes = ASSET_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.exists(ASSET_CACHE_DIR):
+        return 0
+
+    entries = []
+    for f in os.listdir(ASSET_CACHE_DIR):
+        if f.endswith(".mp4") and ".tmp." not in f:
+            st = os.stat(os.path.join(ASSET_CACHE_DIR, f))
+            entries.append((st.st_mtime, st.st_size, f))
+
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, f in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(ASSET_CACHE_DIR, f))
+        except OSError:
+            continue
+        total -= size
+        freed += size
+    return freed
+
+
+def prepare_layers(plan):
+    """
+    Copy of an edit plan whose library layers (overlay, green screen,
+    jumpscare) point at pre-sized transcodes, so renders skip per-frame
+    resize and crop. The clip's own layers and already prepared layers are
+    left alone.
+    """
+    prepared = dict(plan, layers=[])
+    for layer in plan["layers"]:
+        if (
+            layer["kind"] == "video"
+            and layer.get("role") in LIBRARY_ROLES
+            and os.path.dirname(layer["path"]) != ASSET_CACHE_DIR
+        ):
+            _, _, bw, bh = layer["box"]
+            path = prepared_asset(layer["path"], (round(bw), round(bh)), plan["fps"], layer.get("crop"))
+            layer = dict(layer, path=path, crop=None)
+        prepared["layers"].append(layer)
+    return prepared
+
+
+def _library_assets(index):
+    assets = [(p, "overlay") for p in index.files("overlay")]
+    assets += [(p, "greenscreen") for p in index.files("greenscreen")]
+    jumpscare_path = os.path.join(ASSETS_DIR, "jumpscare.mov")
+    if jumpscare_path in index.files("assets"):
+        assets.append((jumpscare_path, "jumpscare"))
+    return assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-transcode library assets for the editor.")
+    parser.add_argument("--width", type=int, default=1920, help="Source clip width the layout is planned from.")
+    parser.add_argument("--height", type=int, default=1080, help="Source clip height the layout is planned from.")
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--max-gb", type=float, default=None, help="Evict the cache down to this size and exit.")
+    args = parser.parse_args()
+
+    if args.max_gb is not None:
+        freed = evict(int(args.max_gb * 1024 ** 3))
+        print(f"Evicted {freed / 1024 ** 2:.1f} MB.")
+        return
+
+    from .asset_index import get_asset_index
+    from .editor_engine import overlay_crop, place_in_output
+
+    index = get_asset_index()
+    w, h = args.width, args.height
+    split_h = int(h * 0.7)
+    for path, role in _library_assets(index):
+        src_size = list(index.meta(path)["size"])
+        layer = {"kind": "video", "src_size": src_size, "crop": None, "box": [0, 0, w, h]}
+        if role == "overlay":
+            layer.update(crop=overlay_crop(src_size, w, h - split_h), box=[0, split_h, w, h - split_h])
+        # Same output placement the planner gives these layers.
+        for placed in place_in_output([layer], w, h):
+            prepared_asset(path, placed["box"][2:], args.fps, placed["crop"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+
+from .config import ASSETS_DIR, GREEN_SCREEN_DIR, IMAGE_DIR, OVERLAY_DIR, SFX_DIR
+from .db_engine import get_asset_meta, save_asset_meta
+from .ffmpeg_tools import probe_media
+
+# kind: (folder, extensions, probe media metadata?)
+ASSET_LIBRARY = {
+    "overlay": (OVERLAY_DIR, ('.mp4', '.mov'), True),
+    "greenscreen": (GREEN_SCREEN_DIR, ('.mp4', '.mov'), True),
+    "image": (IMAGE_DIR, ('jpg', 'png'), False),
+    "sfx": (SFX_DIR, ('mp3',), False),
+    "assets": (ASSETS_DIR, ('.mp3', '.wav', '.mov'), True),
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _tokens(filename):
+    return set(_TOKEN_RE.findall(os.path.splitext(filename)[0].lower()))
+
+
+class _Folder:
+    def __init__(self, path, extensions, probe):
+        self.path = path
+        self.extensions = extensions
+        self.probe = probe
+        self.mtime = None
+        self.files = []
+        self.by_token = {}
+
+    def scan(self):
+        """
+        Re-list the folder if its mtime moved. Returns the file paths whose
+        size/mtime should be checked against stored metadata.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self.mtime, self.files, self.by_token = None, [], {}
+            return []
+        if mtime == self.mtime:
+            return []
+
+        self.mtime = mtime
+        names = sorted(f for f in os.listdir(self.path) if f.lower().endswith(self.extensions))
+        self.files = [os.path.join(self.path, f) for f in names]
+        self.by_token = {}
+        for name, path in zip(names, self.files):
+            for token in _tokens(name):
+                self.by_token.setdefault(token, []).append(path)
+        return self.files if self.probe else []
+
+
+class AssetIndex:
+    """
+    Listings, keyword lookups and probed metadata for the asset library.
+    Folders are re-listed only when their mtime changes; media metadata
+    lives in the asset_meta table and is re-probed only for files whose
+    size or mtime changed (checked again on every meta() lookup).
+    """
+
+    def __init__(self, library=ASSET_LIBRARY):
+        self._folders = {kind: _Folder(*spec) for kind, spec in library.items()}
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            changed = []
+            for folder in self._folders.values():
+                changed += folder.scan()
+            if changed:
+                self._sync_meta(changed)
+
+    def _sync_meta(self, paths):
+        stored = get_asset_meta(p for p in paths if p not in self._meta)
+        self._meta.update(stored)
+
+        probed = {}
+        for path in paths:
+            st = os.stat(path)
+            known = self._meta.get(path)
+            if known and known["size_bytes"] == st.st_size and known["mtime"] == st.st_mtime:
+                continue
+            try:
+                info = probe_media(path)
+            except Exception as e:
+                print(f"[ASSETS] Could not probe {path}: {e}")
+                continue
+            probed[path] = dict(info, size_bytes=st.st_size, mtime=st.st_mtime)
+
+        if probed:
+            self._meta.update(probed)
+            save_asset_meta(probed)
+            print(f"[ASSETS] Probed {len(probed)} new/changed assets")
+
+    def files(self, kind):
+        self.refresh()
+        return list(self._folders[kind].files)
+
+    def find(self, kind, keyword):
+        """
+        Files of `kind` whose name contains `keyword`: a token hit is a dict
+        lookup; otherwise falls back to a substring scan of the cached list.
+        """
+        self.refresh()
+        folder = self._folders[kind]
+        keyword = keyword.lower()
+        hits = folder.by_token.get(keyword)
+        if hits:
+            return list(hits)
+        return [p for p in folder.files if keyword in os.path.basename(p).lower()]
+
+    def pick(self, kind, keyword, rng, extensions=None, exclude=("jumpscare",)):
+        """
+        Random file of `kind` matching `keyword`, or any file if none match.
+        """
+        files = [
+            p for p in self.files(kind)
+            if (extensions is None or p.lower().endswith(extensions))
+            and not any(x in os.path.basename(p).lower() for x in exclude)
+        ]
+        if not files:
+            return None
+        if keyword:
+            allowed = set(files)
+            matches = [p for p in self.find(kind, keyword) if p in allowed]
+            if matches:
+                return rng.choice(matches)
+        return rng.choice(files)
+
+    def meta(self, path):
+        """
+        Stored probe of a library file (duration, size, fps, has_audio),
+        probing on demand for anything outside the indexed folders. The file
+        is stat-ed first: overwriting it in place leaves the folder mtime
+        alone, so refresh() alone would keep serving the old probe.
+        """
+        self.refresh()
+        with self._lock:
+            known = self._meta.get(path)
+            if known:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    self._meta.pop(path, None)
+                    known = None
+                else:
+                    if known["size_bytes"] != st.st_size or known["mtime"] != st.st_mtime:
+                        self._sync_meta([path])
+                        known = self._meta.get(path)
+                        if known and known["mtime"] != st.st_mtime:
+                            known = None  # re-probe failed; don't serve the old one
+        return known if known else probe_media(path)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_asset_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AssetIndex()
+        return _index
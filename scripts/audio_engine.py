@@ -0,0 +1,94 @@
+import os
+import wave
+
+import numpy as np
+
+from .array_cache import ArrayCache
+from .ffmpeg_tools import read_audio
+
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+# Decoded cues kept between renders (SFX, adlib, jumpscare repeat a lot).
+AUDIO_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Cue roles pulled down while a voice line plays, and by how much.
+DUCK_ROLES = ("base",)
+DUCK_TRIGGER_ROLES = ("voice",)
+DUCK_GAIN = 0.5
+DUCK_RAMP_SECONDS = 0.08
+
+_cache = ArrayCache(AUDIO_CACHE_MAX_BYTES)
+
+
+def decode(path, src_start=0.0, duration=None):
+    """
+    float32 (N, AUDIO_CHANNELS) samples at AUDIO_SAMPLE_RATE, decoded once
+    per (file, mtime, range) and served from an LRU afterwards.
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path), round(src_start or 0.0, 3), duration and round(duration, 3))
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    samples = read_audio(path, sample_rate=AUDIO_SAMPLE_RATE, channels=AUDIO_CHANNELS, start=src_start, duration=duration)
+    samples.setflags(write=False)
+    return _cache.put(key, samples)
+
+
+def _duck_envelope(cues, length):
+    """
+    Per-sample gain for ducked roles: DUCK_GAIN under every trigger cue,
+    1.0 elsewhere, with linear ramps instead of hard steps.
+    """
+    envelope = np.ones(length, dtype=np.float32)
+    for cue, samples in cues:
+        if cue.get("role") in DUCK_TRIGGER_ROLES:
+            start = int(round(cue["start"] * AUDIO_SAMPLE_RATE))
+            envelope[max(start, 0):max(start + len(samples), 0)] = DUCK_GAIN
+
+    ramp = int(DUCK_RAMP_SECONDS * AUDIO_SAMPLE_RATE)
+    if ramp > 1 and envelope.min() < 1.0:
+        kernel = np.full(ramp, 1.0 / ramp, dtype=np.float32)
+        padded = np.pad(envelope, (ramp // 2, ramp - 1 - ramp // 2), mode="edge")
+        envelope = np.convolve(padded, kernel, mode="valid").astype(np.float32)
+    return envelope
+
+
+def mix_cues(cues, duration):
+    """
+    Mix audio cues ({path, start, gain, src_start?, duration?, role}) into
+    one preallocated (N, AUDIO_CHANNELS) float32 timeline of `duration`
+    seconds, ducking DUCK_ROLES under voice lines and clipping to [-1, 1].
+    """
+    length = int(round(duration * AUDIO_SAMPLE_RATE))
+    main = np.zeros((length, AUDIO_CHANNELS), dtype=np.float32)
+    ducked = np.zeros((length, AUDIO_CHANNELS), dtype=np.float32)
+
+    decoded = []
+    for cue in cues:
+        samples = decode(cue["path"], cue.get("src_start") or 0.0, cue.get("duration"))
+        decoded.append((cue, samples))
+
+        start = int(round(cue["start"] * AUDIO_SAMPLE_RATE))
+        if start >= length or len(samples) == 0:
+            continue
+        skip = max(-start, 0)
+        start = max(start, 0)
+        end = min(start + len(samples) - skip, length)
+
+        bus = ducked if cue.get("role") in DUCK_ROLES else main
+        bus[start:end] += samples[skip:skip + end - start] * np.float32(cue["gain"])
+
+    if ducked.any():
+        main += ducked * _duck_envelope(decoded, length)[:, None]
+    np.clip(main, -1.0, 1.0, out=main)
+    return main
+
+
+def write_wav(samples, path, sample_rate=AUDIO_SAMPLE_RATE):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(pcm.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
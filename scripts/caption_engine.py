@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from .array_cache import ArrayCache
+
+# Rasterized captions kept between videos (the same words recur a lot).
+CAPTION_CACHE_MAX_BYTES = 64 * 1024 ** 2
+# Extra leading between wrapped lines, as a fraction of the font size.
+CAPTION_LINE_SPACING = 0.1
+
+_cache = ArrayCache(CAPTION_CACHE_MAX_BYTES)
+
+
+@lru_cache(maxsize=32)
+def _load_font(font, fontsize):
+    return ImageFont.truetype(font, fontsize)
+
+
+@lru_cache(maxsize=1024)
+def _layout(text, font, fontsize, width):
+    """
+    Greedy word wrap to `width`: ((line, x_offset), ...) with each line
+    centered, plus the line height and total height in pixels.
+    """
+    face = _load_font(font, fontsize)
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and face.getlength(candidate) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+
+    ascent, descent = face.getmetrics()
+    line_h = ascent + descent + int(fontsize * CAPTION_LINE_SPACING)
+    placed = tuple((line, int(round((width - face.getlength(line)) / 2))) for line in lines)
+    return placed, line_h, max(line_h * len(lines), 1)
+
+
+def rasterize_caption(text, font, fontsize, color, width):
+    """
+    Render a caption chunk to an RGBA uint8 array, wrapped to width and
+    centered, with PIL/FreeType in-process. Results are cached read-only by
+    (text, font, size, color, width). Both render backends place the same
+    pixels.
+    """
+    width, fontsize = int(width), int(fontsize)
+    key = (text, font, fontsize, color, width)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    lines, line_h, height = _layout(text, font, fontsize, width)
+    face = _load_font(font, fontsize)
+    alpha = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(alpha)
+    for row, (line, x) in enumerate(lines):
+        draw.text((x, row * line_h), line, font=face, fill=255)
+
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[:, :, :3] = ImageColor.getrgb(color)[:3]
+    rgba[:, :, 3] = np.asarray(alpha, dtype=np.uint8)
+    rgba.setflags(write=False)
+    return _cache.put(key, rgba)
+
+
+def caption_position(layer, text_w):
+    """
+    Top-left of a rasterized caption: centered on the layer's anchor x,
+    top edge at its anchor y.
+    """
+    x_center, top = layer["anchor"]
+    return int(round(x_center - text_w / 2)), int(round(top))
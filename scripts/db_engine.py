@@ -3,6 +3,7 @@ from sqlalchemy import and_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
+import os
 
 DATABASE_URL = "sqlite:///brainrot.db"
 Base = declarative_base()
@@ -34,6 +35,30 @@ class CreatorHistory(Base):
     creator_name = Column(String)
     last_used_at = Column(DateTime, nullable=True)
 
+class CreatorStats(Base):
+    __tablename__ = "creator_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, index=True)
+    creator_id = Column(String, index=True)
+    creator_name = Column(String)
+
+    # Cached lookups (discovery decides freshness from the timestamps)
+    follower_total = Column(Integer, nullable=True)
+    followers_checked_at = Column(DateTime, nullable=True)
+    category = Column(String, nullable=True)
+
+    # Negative cache: why we last rejected this creator
+    rejection_reason = Column(String, nullable=True) # too_many_followers
+    rejected_at = Column(DateTime, nullable=True)
+
+class TwitchCategory(Base):
+    __tablename__ = "twitch_categories"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True) # Name as written in VALID_TWITCH_CATEGORIES
+    game_id = Column(String, nullable=True) # NULL = Helix had no match
+    game_name = Column(String, nullable=True)
+    resolved_at = Column(DateTime)
+
 class ClipHistory(Base):
     __tablename__ = "clip_history"
     id = Column(Integer, primary_key=True, index=True)
@@ -43,6 +68,58 @@ class ClipHistory(Base):
     creator_id = Column(String)
     used_at = Column(DateTime, nullable=True)
 
+class ClipFingerprint(Base):
+    __tablename__ = "clip_fingerprints"
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, index=True)
+    clip_id = Column(String, index=True)
+    creator_id = Column(String)
+    fingerprint = Column(String) # Per-step hashes, see fingerprint_engine.encode_fingerprint
+    created_at = Column(DateTime)
+
+class ClipScreening(Base):
+    __tablename__ = "clip_screening"
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, index=True)
+    clip_id = Column(String, index=True)
+    creator_id = Column(String)
+    raw_filename = Column(String) # video_queue.file_path ends with this name
+    view_count = Column(Integer, nullable=True) # Source views at discovery time
+
+    motion = Column(Float)
+    rms_db = Column(Float)
+    active_ratio = Column(Float)
+    peak_density = Column(Float)
+    score = Column(Float)
+    verdict = Column(String) # pass, weak, reject
+    screened_at = Column(DateTime)
+
+class AssetMeta(Base):
+    __tablename__ = "asset_meta"
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, index=True)
+    size_bytes = Column(Integer)
+    mtime = Column(Float) # Row is stale once the file's size or mtime differs
+    duration = Column(Float, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    fps = Column(Float, nullable=True)
+    has_audio = Column(Boolean, default=False)
+    probed_at = Column(DateTime)
+
+class RenderLog(Base):
+    __tablename__ = "render_log"
+    id = Column(Integer, primary_key=True, index=True)
+    output_path = Column(String)
+    profile = Column(String) # fast, balanced, archival (see encode_profiles)
+    backend = Column(String)
+    segmented = Column(Boolean, default=False)
+    video_seconds = Column(Float)
+    render_seconds = Column(Float)
+    speed = Column(Float) # Video seconds rendered per wall-clock second
+    size_bytes = Column(Integer, nullable=True)
+    rendered_at = Column(DateTime)
+
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
@@ -55,6 +132,12 @@ def add_video_to_queue(path, streamer):
     db.close()
     print(f"[DB] Queued video for {streamer}")
 
+def count_pending_videos():
+    db = SessionLocal()
+    count = db.query(VideoQueue).filter(VideoQueue.status == "PENDING").count()
+    db.close()
+    return count
+
 def get_next_video():
     db = SessionLocal()
     # FIFO: First In, First Out
@@ -94,6 +177,38 @@ def is_creator_recently_used(platform, creator_id, within_days=7):
     db.close()
     return row is not None
 
+# SQLite caps bound parameters per statement; stay well under it.
+_IN_CHUNK = 500
+
+def _chunked(values, size=_IN_CHUNK):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def get_recently_used_creator_ids(platform, creator_ids, within_days=7):
+    """
+    Set-based is_creator_recently_used: returns the subset of creator_ids
+    used on this platform since the cutoff, one query per 500 ids.
+    """
+    creator_ids = {c for c in creator_ids if c}
+    if not creator_ids:
+        return set()
+    db = SessionLocal()
+    cutoff = datetime.now() - timedelta(days=within_days)
+    used = set()
+    for chunk in _chunked(creator_ids):
+        rows = db.query(CreatorHistory.creator_id).filter(
+            and_(
+                CreatorHistory.platform == platform,
+                CreatorHistory.creator_id.in_(chunk),
+                CreatorHistory.last_used_at != None,
+                CreatorHistory.last_used_at >= cutoff
+            )
+        ).distinct().all()
+        used.update(r[0] for r in rows)
+    db.close()
+    return used
+
 def mark_creator_used(platform, creator_id, creator_name):
     db = SessionLocal()
     row = db.query(CreatorHistory).filter(
@@ -109,6 +224,117 @@ def mark_creator_used(platform, creator_id, creator_name):
     db.commit()
     db.close()
 
+def get_creator_stats(platform, creator_ids):
+    """
+    Returns {creator_id: stats dict} for the creators we have cached stats for.
+    """
+    creator_ids = {c for c in creator_ids if c}
+    if not creator_ids:
+        return {}
+    db = SessionLocal()
+    stats = {}
+    for chunk in _chunked(creator_ids):
+        rows = db.query(CreatorStats).filter(
+            and_(
+                CreatorStats.platform == platform,
+                CreatorStats.creator_id.in_(chunk)
+            )
+        ).all()
+        for row in rows:
+            stats[row.creator_id] = {
+                "creator_name": row.creator_name,
+                "follower_total": row.follower_total,
+                "followers_checked_at": row.followers_checked_at,
+                "category": row.category,
+                "rejection_reason": row.rejection_reason,
+                "rejected_at": row.rejected_at,
+            }
+    db.close()
+    return stats
+
+def save_creator_stats(platform, entries):
+    """
+    Upsert creator stats in one session. Each entry needs creator_id and may
+    carry creator_name, follower_total, category and rejection_reason
+    (None clears a previous rejection).
+    """
+    entries = [e for e in entries if e.get("creator_id")]
+    if not entries:
+        return
+    db = SessionLocal()
+    now = datetime.now()
+    existing = {}
+    for chunk in _chunked({e["creator_id"] for e in entries}):
+        rows = db.query(CreatorStats).filter(
+            and_(
+                CreatorStats.platform == platform,
+                CreatorStats.creator_id.in_(chunk)
+            )
+        ).all()
+        existing.update((row.creator_id, row) for row in rows)
+
+    for e in entries:
+        row = existing.get(e["creator_id"])
+        if not row:
+            row = CreatorStats(platform=platform, creator_id=e["creator_id"])
+            db.add(row)
+            existing[e["creator_id"]] = row
+        if e.get("creator_name"):
+            row.creator_name = e["creator_name"]
+        if "category" in e:
+            row.category = e["category"]
+        if e.get("follower_total") is not None:
+            row.follower_total = e["follower_total"]
+            row.followers_checked_at = now
+        if "rejection_reason" in e:
+            row.rejection_reason = e["rejection_reason"]
+            row.rejected_at = now if e["rejection_reason"] else None
+    db.commit()
+    db.close()
+
+def get_twitch_categories(names, max_age_days=30):
+    """
+    Returns {name: [game_id, ...]} for names resolved within max_age_days.
+    An empty list means Helix had no match for that name.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    db = SessionLocal()
+    cutoff = datetime.now() - timedelta(days=max_age_days)
+    resolved = {}
+    for chunk in _chunked(names):
+        rows = db.query(TwitchCategory).filter(
+            and_(
+                TwitchCategory.name.in_(chunk),
+                TwitchCategory.resolved_at >= cutoff
+            )
+        ).all()
+        for row in rows:
+            ids = resolved.setdefault(row.name, [])
+            if row.game_id:
+                ids.append(row.game_id)
+    db.close()
+    return resolved
+
+def save_twitch_categories(resolved):
+    """
+    Replace cached game ids. resolved is {name: [(game_id, game_name), ...]}.
+    """
+    if not resolved:
+        return
+    db = SessionLocal()
+    now = datetime.now()
+    for chunk in _chunked(resolved.keys()):
+        db.query(TwitchCategory).filter(TwitchCategory.name.in_(chunk)).delete(synchronize_session=False)
+    for name, games in resolved.items():
+        if not games:
+            db.add(TwitchCategory(name=name, resolved_at=now))
+        for game_id, game_name in games:
+            db.add(TwitchCategory(name=name, game_id=game_id, game_name=game_name, resolved_at=now))
+    db.commit()
+    db.close()
+
 def is_clip_used(platform, clip_id):
     db = SessionLocal()
     row = db.query(ClipHistory).filter(
@@ -120,6 +346,26 @@ def is_clip_used(platform, clip_id):
     db.close()
     return row is not None
 
+def get_used_clip_ids(platform, clip_ids):
+    """
+    Set-based is_clip_used: returns the subset of clip_ids already used.
+    """
+    clip_ids = {c for c in clip_ids if c}
+    if not clip_ids:
+        return set()
+    db = SessionLocal()
+    used = set()
+    for chunk in _chunked(clip_ids):
+        rows = db.query(ClipHistory.clip_id).filter(
+            and_(
+                ClipHistory.platform == platform,
+                ClipHistory.clip_id.in_(chunk)
+            )
+        ).distinct().all()
+        used.update(r[0] for r in rows)
+    db.close()
+    return used
+
 def mark_clip_used(platform, clip_id, clip_url, creator_id):
     db = SessionLocal()
     row = ClipHistory(
@@ -132,3 +378,112 @@ def mark_clip_used(platform, clip_id, clip_url, creator_id):
     db.add(row)
     db.commit()
     db.close()
+
+def add_clip_fingerprint(platform, clip_id, creator_id, fingerprint_hex):
+    db = SessionLocal()
+    db.add(ClipFingerprint(
+        platform=platform,
+        clip_id=clip_id,
+        creator_id=creator_id,
+        fingerprint=fingerprint_hex,
+        created_at=datetime.now()
+    ))
+    db.commit()
+    db.close()
+
+def get_clip_fingerprints():
+    """
+    Returns [(platform, clip_id, fingerprint_hex), ...] for every stored clip.
+    """
+    db = SessionLocal()
+    rows = db.query(
+        ClipFingerprint.platform,
+        ClipFingerprint.clip_id,
+        ClipFingerprint.fingerprint
+    ).all()
+    db.close()
+    return [tuple(r) for r in rows]
+
+def save_clip_screening(candidate, raw_path, result):
+    db = SessionLocal()
+    db.add(ClipScreening(
+        platform=candidate.get("platform"),
+        clip_id=candidate.get("clip_id"),
+        creator_id=candidate.get("creator_id"),
+        raw_filename=os.path.basename(raw_path),
+        view_count=candidate.get("view_count"),
+        motion=result["motion"],
+        rms_db=result["rms_db"],
+        active_ratio=result["active_ratio"],
+        peak_density=result["peak_density"],
+        score=result["score"],
+        verdict=result["verdict"],
+        screened_at=datetime.now()
+    ))
+    db.commit()
+    db.close()
+
+def get_asset_meta(paths):
+    """
+    Returns {path: meta dict} for the paths we have probed before.
+    """
+    paths = set(paths)
+    if not paths:
+        return {}
+    db = SessionLocal()
+    meta = {}
+    for chunk in _chunked(paths):
+        for row in db.query(AssetMeta).filter(AssetMeta.path.in_(chunk)).all():
+            meta[row.path] = {
+                "size_bytes": row.size_bytes,
+                "mtime": row.mtime,
+                "duration": row.duration,
+                "size": (row.width, row.height) if row.width else None,
+                "fps": row.fps,
+                "has_audio": bool(row.has_audio),
+            }
+    db.close()
+    return meta
+
+def save_asset_meta(entries):
+    """
+    Replace probed metadata. entries is {path: meta dict} as returned by
+    get_asset_meta.
+    """
+    if not entries:
+        return
+    db = SessionLocal()
+    now = datetime.now()
+    for chunk in _chunked(entries.keys()):
+        db.query(AssetMeta).filter(AssetMeta.path.in_(chunk)).delete(synchronize_session=False)
+    for path, m in entries.items():
+        size = m.get("size") or (None, None)
+        db.add(AssetMeta(
+            path=path,
+            size_bytes=m["size_bytes"],
+            mtime=m["mtime"],
+            duration=m.get("duration"),
+            width=size[0],
+            height=size[1],
+            fps=m.get("fps"),
+            has_audio=bool(m.get("has_audio")),
+            probed_at=now
+        ))
+    db.commit()
+    db.close()
+
+def save_render_log(output_path, profile, backend, segmented, video_seconds, render_seconds, size_bytes):
+    db = SessionLocal()
+    db.add(RenderLog(
+        output_path=output_path,
+        profile=profile,
+        backend=backend,
+        segmented=segmented,
+        video_seconds=video_seconds,
+        render_seconds=render_seconds,
+        speed=video_seconds / render_seconds if render_seconds else None,
+        size_bytes=size_bytes,
+        rendered_at=datetime.now()
+    ))
+    db.commit()
+    db.close()
@@ -2,12 +2,11 @@ import os
 import random
 import re
 import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import requests
-from googleapiclient.errors import HttpError
-
-from googleapiclient.discovery import build
 
 from .config import (
     INPUT_DIR,
@@ -18,11 +17,7 @@ from .config import (
     DISCOVERY_UNIQUE_DAYS,
     DISCOVERY_USE_YOUTUBE,
     DISCOVERY_USE_TWITCH,
-    YOUTUBE_DATA_API_KEY,
     YOUTUBE_SUB_MAX,
-    YOUTUBE_SHORTS_MAX_SECONDS,
-    TWITCH_CLIENT_ID,
-    TWITCH_CLIENT_SECRET,
     TWITCH_FOLLOWER_MAX,
     TWITCH_STREAMS_PER_PAGE,
     TWITCH_STREAMS_PAGES,
@@ -30,12 +25,24 @@ from .config import (
 from .ai_engine import generate_roast
 from .tts_engine import generate_audio
 from .editor_engine import apply_chaos
+from .download_engine import download_all, download_clip, DOWNLOAD_WORKERS
+from .pipeline_engine import run_pipeline
+from .render_farm import RenderFarm
+from .ranking_engine import rank_candidates
+from .fingerprint_engine import FingerprintIndex, compute_fingerprint, get_fingerprint_index, persist_fingerprint
+from .prescreen_engine import screen_and_record
+from .twitch_client import get_twitch_client
+from .youtube_discovery import YouTubeDiscovery
 from .db_engine import (
     add_video_to_queue,
-    is_creator_recently_used,
+    get_recently_used_creator_ids,
     mark_creator_used,
-    is_clip_used,
+    get_used_clip_ids,
     mark_clip_used,
+    get_creator_stats,
+    save_creator_stats,
+    get_twitch_categories,
+    save_twitch_categories,
 )
 
 
@@ -64,17 +71,60 @@ BANNED_CATEGORIES = [
 ]
 
 
-def _parse_iso8601_duration(duration_str):
+def _compile_category_matcher(names):
+    # Longest names first so the alternation prefers the most specific hit.
+    ordered = sorted(set(names), key=len, reverse=True)
+    return re.compile("|".join(re.escape(n) for n in ordered), re.IGNORECASE)
+
+
+_BANNED_CATEGORY_RE = _compile_category_matcher(BANNED_CATEGORIES)
+# "game" keeps the old catch-all for games we don't list explicitly.
+_VALID_CATEGORY_RE = _compile_category_matcher(VALID_TWITCH_CATEGORIES + ["game"])
+
+# Query /helix/streams by resolved game_id instead of paging generic streams.
+TWITCH_FILTER_BY_GAME_ID = True
+# Resolved game ids are cached in twitch_categories for this long.
+TWITCH_GAME_ID_TTL_DAYS = 30
+# Helix accepts at most 100 game_id values per streams request.
+TWITCH_MAX_GAME_IDS_PER_QUERY = 100
+
+# Max parallel Helix lookups (followers, clips). 1 = fully sequential.
+DISCOVERY_CONCURRENCY = 8
+
+# Overlap download / Gemini / TTS / render across clips (False = one clip at a time).
+DISCOVERY_PIPELINE = True
+# Worker threads per production stage in pipeline mode.
+PIPELINE_STAGE_WORKERS = {
+    "download": DOWNLOAD_WORKERS,
+    "dedupe": 1,
+    "screen": 1,
+    "analyze": 2,
+    "tts": 2,
+    "render": 1,
+}
+# Render in separate processes sized by cores/memory (pipeline mode only).
+DISCOVERY_RENDER_FARM = True
+
+# Rank a pool of candidates and only produce the best target_count.
+DISCOVERY_RANKING = True
+# Pool size = target_count * this many distinct creators.
+RANKING_POOL_FACTOR = 4
+
+# How long cached creator_stats stay trustworthy before we hit Helix again.
+CREATOR_FOLLOWER_TTL_HOURS = 72
+CREATOR_REJECTION_TTL_HOURS = 24 * 7
+
+
+def _fan_out(fn, items, concurrency=DISCOVERY_CONCURRENCY):
     """
-    Parse ISO 8601 durations like PT1M2S into seconds.
+    Run fn over items on a bounded thread pool.
+    Results come back in the same order as items.
     """
-    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", duration_str)
-    if not match:
-        return None
-    hours = int(match.group(1) or 0)
-    minutes = int(match.group(2) or 0)
-    seconds = int(match.group(3) or 0)
-    return hours * 3600 + minutes * 60 + seconds
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as pool:
+        return list(pool.map(fn, items))
 
 
 def _safe_filename(value):
@@ -82,216 +132,170 @@ def _safe_filename(value):
     return value.strip("_")[:80] or "clip"
 
 
-def _download_with_ytdlp(url, output_path):
-    try:
-        import yt_dlp
-    except Exception:
-        print("yt-dlp not installed; skipping download.")
-        return None
-
-    ydl_opts = {
-        "outtmpl": output_path,
-        "format": "mp4/best",
-        "quiet": True,
-        "no_warnings": True,
-    }
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        return output_path if os.path.exists(output_path) else None
-    except Exception as e:
-        print(f"Download failed for {url}: {e}")
-        return None
+def _is_valid_category(category_name):
+    """
+    Check if the category is gaming or chat-related.
+    """
+    if not category_name:
+        return False
 
+    # Check banned categories first
+    if _BANNED_CATEGORY_RE.search(category_name):
+        print(f"  ❌ Skipping banned category: {category_name}")
+        return False
 
-def _discover_youtube_shorts(lookback_hours, sub_max, unique_days, query=None):
-    if not YOUTUBE_DATA_API_KEY:
-        print("YouTube Data API key missing; skipping YouTube discovery.")
-        return []
+    # Listed categories, or anything with "game" in it
+    return _VALID_CATEGORY_RE.search(category_name) is not None
 
-    youtube = build("youtube", "v3", developerKey=YOUTUBE_DATA_API_KEY)
-    published_after = (datetime.now(timezone.utc) - timedelta(hours=lookback_hours)).isoformat()
-
-    search_params = {
-        "part": "snippet",
-        "type": "video",
-        "order": "date",
-        "q": query if query else "shorts",
-        "videoDuration": "short",
-        "maxResults": 25,
-        "publishedAfter": published_after,
-    }
-    search_req = youtube.search().list(**search_params)
-    try:
-        search_res = search_req.execute()
-    except HttpError as e:
-        print(f"[WARN] YouTube search failed: {e}")
-        return []
 
-    video_ids = [item["id"]["videoId"] for item in search_res.get("items", [])]
-    if not video_ids:
-        return []
+def _resolve_twitch_game_ids(client, ttl_days=TWITCH_GAME_ID_TTL_DAYS):
+    """
+    Map VALID_TWITCH_CATEGORIES to Helix game ids, using the local cache.
+    Exact names are looked up in one /games call; names Helix doesn't know
+    exactly (e.g. "Call of Duty") fall back to /search/categories.
+    """
+    cached = get_twitch_categories(VALID_TWITCH_CATEGORIES, max_age_days=ttl_days)
+    missing = [n for n in VALID_TWITCH_CATEGORIES if n not in cached]
+    if missing:
+        print(f"  🎮 Resolving {len(missing)} Twitch categories to game ids...")
+        resolved = {name: [] for name in missing}
+        lookup = {name.lower(): name for name in missing}
+
+        for i in range(0, len(missing), 100):
+            res = client.get("games", params={"name": missing[i:i + 100]})
+            if res is None or res.status_code != 200:
+                return None
+            for game in res.json().get("data", []):
+                name = lookup.get(game.get("name", "").lower())
+                if name:
+                    resolved[name].append((game["id"], game["name"]))
+
+        for name in [n for n, games in resolved.items() if not games]:
+            res = client.get("search/categories", params={"query": name, "first": 20})
+            if res is None or res.status_code != 200:
+                continue
+            for game in res.json().get("data", []):
+                game_name = game.get("name", "")
+                if name.lower() in game_name.lower() and not _BANNED_CATEGORY_RE.search(game_name):
+                    resolved[name].append((game["id"], game_name))
 
-    video_req = youtube.videos().list(
-        part="contentDetails,snippet",
-        id=",".join(video_ids),
-        maxResults=25,
-    )
-    try:
-        video_res = video_req.execute()
-    except HttpError as e:
-        print(f"[WARN] YouTube video lookup failed: {e}")
-        return []
+        save_twitch_categories(resolved)
+        for name, games in resolved.items():
+            cached[name] = [game_id for game_id, _ in games]
 
-    candidates = []
-    channel_ids = set()
-    for item in video_res.get("items", []):
-        duration = _parse_iso8601_duration(item["contentDetails"]["duration"])
-        if duration is None or duration > YOUTUBE_SHORTS_MAX_SECONDS:
-            continue
-        channel_id = item["snippet"]["channelId"]
-        channel_ids.add(channel_id)
-        candidates.append({
-            "platform": "youtube",
-            "clip_id": item["id"],
-            "clip_url": f"https://www.youtube.com/watch?v={item['id']}",
-            "creator_id": channel_id,
-            "creator_name": item["snippet"]["channelTitle"],
-            "title": item["snippet"]["title"],
-        })
+    game_ids = []
+    for name in VALID_TWITCH_CATEGORIES:
+        for game_id in cached.get(name, []):
+            if game_id not in game_ids:
+                game_ids.append(game_id)
+    return game_ids
 
-    if not candidates:
-        return []
 
-    channel_req = youtube.channels().list(
-        part="statistics",
-        id=",".join(channel_ids),
-        maxResults=50,
-    )
+def _iter_stream_pages(client, max_pages, per_page, game_ids=None):
+    """
+    Yield pages of English live streams, at most max_pages in total.
+    With game_ids, each request is scoped to up to 100 of them.
+    """
+    id_groups = [None]
+    if game_ids:
+        step = TWITCH_MAX_GAME_IDS_PER_QUERY
+        id_groups = [game_ids[i:i + step] for i in range(0, len(game_ids), step)]
+
+    pages = 0
+    for group in id_groups:
+        after = None
+        while pages < max_pages:
+            params = {
+                "first": min(per_page, 100),
+                "language": "en"  # FORCE ENGLISH ONLY
+            }
+            if group:
+                params["game_id"] = group
+            if after:
+                params["after"] = after
+
+            streams_res = client.get("streams", params=params)
+            if streams_res is None:
+                return
+            if streams_res.status_code != 200:
+                print(f"Twitch streams fetch failed: {streams_res.status_code} {streams_res.text}")
+                return
+
+            payload = streams_res.json()
+            streams = payload.get("data", [])
+            if not streams:
+                break
+
+            pages += 1
+            yield pages, streams
+
+            after = payload.get("pagination", {}).get("cursor")
+            if not after:
+                break
+
+
+def _fetch_follower_total(client, broadcaster_id):
     try:
-        channel_res = channel_req.execute()
-    except HttpError as e:
-        print(f"[WARN] YouTube channel lookup failed: {e}")
-        return []
-    subs_by_channel = {}
-    for item in channel_res.get("items", []):
-        try:
-            subs_by_channel[item["id"]] = int(item["statistics"].get("subscriberCount", 0))
-        except Exception:
-            subs_by_channel[item["id"]] = 0
-
-    filtered = []
-    for c in candidates:
-        subs = subs_by_channel.get(c["creator_id"], 0)
-        if subs >= sub_max:
-            continue
-        if query:
-            if query.lower() not in c["creator_name"].lower():
-                continue
-        if is_creator_recently_used(c["platform"], c["creator_id"], within_days=unique_days):
-            continue
-        if is_clip_used(c["platform"], c["clip_id"]):
-            continue
-        filtered.append(c)
-
-    return filtered
-
-
-def _get_twitch_app_token():
-    if not TWITCH_CLIENT_ID or not TWITCH_CLIENT_SECRET:
+        followers_res = client.get(
+            "channels/followers",
+            params={"broadcaster_id": broadcaster_id, "first": 1},
+        )
+    except requests.RequestException as e:
+        print(f"  [WARN] Follower lookup failed for {broadcaster_id}: {e}")
         return None
-
-    token_url = "https://id.twitch.tv/oauth2/token"
-    params = {
-        "client_id": TWITCH_CLIENT_ID,
-        "client_secret": TWITCH_CLIENT_SECRET,
-        "grant_type": "client_credentials",
-    }
-    res = requests.post(token_url, params=params, timeout=10)
-    if res.status_code != 200:
-        print(f"Twitch auth failed: {res.status_code} {res.text}")
+    if followers_res is None or followers_res.status_code != 200:
         return None
-    return res.json().get("access_token")
+    return followers_res.json().get("total", 0)
 
 
-def _twitch_headers(token):
-    return {
-        "Client-ID": TWITCH_CLIENT_ID,
-        "Authorization": f"Bearer {token}",
-    }
+def _is_fresh(checked_at, ttl_hours):
+    return checked_at is not None and datetime.now() - checked_at < timedelta(hours=ttl_hours)
 
 
-def _is_valid_category(category_name):
+def iter_twitch_creators(lookback_hours, follower_max, unique_days, max_pages, per_page,
+                         concurrency=DISCOVERY_CONCURRENCY,
+                         follower_ttl_hours=CREATOR_FOLLOWER_TTL_HOURS,
+                         rejection_ttl_hours=CREATOR_REJECTION_TTL_HOURS,
+                         by_game_id=TWITCH_FILTER_BY_GAME_ID,
+                         shuffle=False):
     """
-    Check if the category is gaming or chat-related.
+    Lazily yield eligible Twitch creators.
+    Pages are fetched and follower lookups run (in chunks of `concurrency`)
+    only as the caller keeps iterating, so stopping early saves the calls.
     """
-    if not category_name:
-        return False
-    
-    # Check banned categories first
-    for banned in BANNED_CATEGORIES:
-        if banned.lower() in category_name.lower():
-            print(f"  ❌ Skipping banned category: {category_name}")
-            return False
-    
-    # Check valid categories
-    for valid in VALID_TWITCH_CATEGORIES:
-        if valid.lower() in category_name.lower():
-            return True
-    
-    # If it contains "game" or has high viewer count, might be a game we don't know
-    if "game" in category_name.lower():
-        return True
-    
-    return False
-
-
-def _discover_twitch_creators(lookback_hours, follower_max, unique_days, max_pages, per_page):
-    token = _get_twitch_app_token()
-    if not token:
+    client = get_twitch_client()
+    if not client.get_token():
         print("Twitch credentials missing; skipping Twitch discovery.")
-        return []
+        return
 
-    headers = _twitch_headers(token)
-    streams_url = "https://api.twitch.tv/helix/streams"
-    creators = []
     seen = set()
-    after = None
-
-    print(f"\n🔍 Searching for English gaming/chat streamers...")
 
-    for page_num in range(max_pages):
-        params = {
-            "first": min(per_page, 100),
-            "language": "en"  # FORCE ENGLISH ONLY
-        }
-        if after:
-            params["after"] = after
-            
-        streams_res = requests.get(streams_url, headers=headers, params=params, timeout=10)
-        if streams_res.status_code != 200:
-            print(f"Twitch streams fetch failed: {streams_res.status_code} {streams_res.text}")
-            break
+    game_ids = None
+    if by_game_id:
+        game_ids = _resolve_twitch_game_ids(client)
+        if not game_ids:
+            print("  [WARN] No Twitch game ids resolved; falling back to generic stream paging.")
 
-        payload = streams_res.json()
-        streams = payload.get("data", [])
-        if not streams:
-            break
+    print(f"\n🔍 Searching for English gaming/chat streamers...")
 
-        print(f"  📄 Page {page_num + 1}: Found {len(streams)} streams")
+    for page_num, streams in _iter_stream_pages(client, max_pages, per_page, game_ids=game_ids):
+        print(f"  📄 Page {page_num}: Found {len(streams)} streams")
 
+        eligible = []
+        page_ids = set()
         for stream in streams:
             broadcaster_id = stream.get("user_id")
             broadcaster_name = stream.get("user_name")
             game_name = stream.get("game_name", "")
             viewer_count = stream.get("viewer_count", 0)
             
-            if not broadcaster_id or broadcaster_id in seen:
+            if not broadcaster_id or broadcaster_id in seen or broadcaster_id in page_ids:
                 continue
             if not re.match(r"^[A-Za-z0-9_]+$", broadcaster_name or ""):
                 continue
 
-            # === CATEGORY FILTER ===
+            # === CATEGORY FILTER (free from the stream payload; not cached,
+            # a creator's category changes between streams) ===
             if not _is_valid_category(game_name):
                 continue
 
@@ -300,71 +304,118 @@ def _discover_twitch_creators(lookback_hours, follower_max, unique_days, max_pag
                 print(f"  ⏭️  Skipping {broadcaster_name} - only {viewer_count} viewers")
                 continue
 
-            # === FOLLOWER CHECK ===
-            followers_url = "https://api.twitch.tv/helix/channels/followers"
-            followers_res = requests.get(
-                followers_url,
-                headers=headers,
-                params={"broadcaster_id": broadcaster_id, "first": 1},
-                timeout=10,
-            )
-            if followers_res.status_code != 200:
-                continue
-            follower_total = followers_res.json().get("total", 0)
-            if follower_total > follower_max:
-                print(f"  ⏭️  Skipping {broadcaster_name} - too many followers ({follower_total})")
-                continue
+            eligible.append(stream)
+            page_ids.add(broadcaster_id)
 
-            # === UNIQUENESS CHECK ===
-            if is_creator_recently_used("twitch", broadcaster_id, within_days=unique_days):
-                print(f"  ⏭️  Skipping {broadcaster_name} - recently used")
+        # === UNIQUENESS CHECK (one query per page, before paying for follower calls) ===
+        recently_used = get_recently_used_creator_ids(
+            "twitch", page_ids, within_days=unique_days
+        )
+        fresh = []
+        for stream in eligible:
+            if stream["user_id"] in recently_used:
+                print(f"  ⏭️  Skipping {stream['user_name']} - recently used")
                 continue
+            fresh.append(stream)
+        eligible = fresh
+        if shuffle:
+            random.shuffle(eligible)
+
+        # === CACHED VERDICTS (skip Helix for creators we know about) ===
+        cached = get_creator_stats("twitch", [s["user_id"] for s in eligible])
+        known_totals = {}
+        candidates = []
+        for stream in eligible:
+            st = cached.get(stream["user_id"])
+            if st:
+                if (
+                    st["rejection_reason"] == "too_many_followers"
+                    and _is_fresh(st["rejected_at"], rejection_ttl_hours)
+                    and (st["follower_total"] or 0) > follower_max
+                ):
+                    print(f"  ⏭️  Skipping {stream['user_name']} - too many followers (cached {st['follower_total']})")
+                    continue
+                if st["follower_total"] is not None and _is_fresh(st["followers_checked_at"], follower_ttl_hours):
+                    known_totals[stream["user_id"]] = st["follower_total"]
+            candidates.append(stream)
+
+        # === FOLLOWER CHECK (one concurrent chunk at a time, results in order) ===
+        chunk_size = max(1, concurrency)
+        for chunk_start in range(0, len(candidates), chunk_size):
+            chunk = candidates[chunk_start:chunk_start + chunk_size]
+            need_lookup = [s for s in chunk if s["user_id"] not in known_totals]
+            fetched = _fan_out(
+                lambda s: _fetch_follower_total(client, s["user_id"]),
+                need_lookup,
+                concurrency=concurrency,
+            )
+            stats_updates = []
+            for stream, total in zip(need_lookup, fetched):
+                if total is None:
+                    continue
+                known_totals[stream["user_id"]] = total
+                stats_updates.append({
+                    "creator_id": stream["user_id"],
+                    "creator_name": stream["user_name"],
+                    "category": stream.get("game_name", ""),
+                    "follower_total": total,
+                    "rejection_reason": "too_many_followers" if total > follower_max else None,
+                })
+            save_creator_stats("twitch", stats_updates)
+
+            for stream in chunk:
+                broadcaster_id = stream["user_id"]
+                broadcaster_name = stream["user_name"]
+                game_name = stream.get("game_name", "")
+                viewer_count = stream.get("viewer_count", 0)
+                follower_total = known_totals.get(broadcaster_id)
+
+                if follower_total is None:
+                    continue
+                if follower_total > follower_max:
+                    print(f"  ⏭️  Skipping {broadcaster_name} - too many followers ({follower_total})")
+                    continue
 
-            print(f"  ✅ Found: {broadcaster_name} | {game_name} | {viewer_count} viewers | {follower_total} followers")
-
-            creators.append({
-                "creator_id": broadcaster_id,
-                "creator_name": broadcaster_name,
-                "game_name": game_name,
-                "viewer_count": viewer_count,
-            })
-            seen.add(broadcaster_id)
-
-        after = payload.get("pagination", {}).get("cursor")
-        if not after:
-            break
+                print(f"  ✅ Found: {broadcaster_name} | {game_name} | {viewer_count} viewers | {follower_total} followers")
 
-    print(f"\n✅ Total valid streamers found: {len(creators)}\n")
-    return creators
+                seen.add(broadcaster_id)
+                yield {
+                    "creator_id": broadcaster_id,
+                    "creator_name": broadcaster_name,
+                    "game_name": game_name,
+                    "viewer_count": viewer_count,
+                    "follower_total": follower_total,
+                }
 
 
 def _discover_twitch_clips_for_creator(creator_id, creator_name, lookback_hours, unique_days):
-    token = _get_twitch_app_token()
-    if not token:
-        return []
-    headers = _twitch_headers(token)
+    client = get_twitch_client()
     started_at = (datetime.now(timezone.utc) - timedelta(hours=lookback_hours)).isoformat()
-    clips_url = "https://api.twitch.tv/helix/clips"
-    clips_res = requests.get(
-        clips_url,
-        headers=headers,
-        params={
-            "broadcaster_id": creator_id,
-            "started_at": started_at,
-            "first": 10,
-        },
-        timeout=10,
-    )
-    if clips_res.status_code != 200:
+    try:
+        clips_res = client.get(
+            "clips",
+            params={
+                "broadcaster_id": creator_id,
+                "started_at": started_at,
+                "first": 10,
+            },
+        )
+    except requests.RequestException as e:
+        print(f"  [WARN] Clip lookup failed for {creator_name}: {e}")
         return []
+    if clips_res is None or clips_res.status_code != 200:
+        return []
+
+    data = clips_res.json().get("data", [])
+    used_clips = get_used_clip_ids("twitch", [clip.get("id") for clip in data])
 
     clips = []
-    for clip in clips_res.json().get("data", []):
+    for clip in data:
         clip_id = clip.get("id")
         clip_url = clip.get("url")
         if not clip_id or not clip_url:
             continue
-        if is_clip_used("twitch", clip_id):
+        if clip_id in used_clips:
             continue
         clips.append({
             "platform": "twitch",
@@ -373,22 +424,23 @@ def _discover_twitch_clips_for_creator(creator_id, creator_name, lookback_hours,
             "creator_id": creator_id,
             "creator_name": creator_name,
             "title": clip.get("title", ""),
+            # Ranking inputs
+            "view_count": clip.get("view_count", 0),
+            "created_at": clip.get("created_at"),
+            "duration": clip.get("duration"),
         })
     return clips
 
 
-async def _generate_tts_files(script, persona):
+async def _generate_tts_files(script, persona, prefix=None):
     tts_files = []
     for i, line in enumerate(script):
-        path = await generate_audio(line.get("text"), i, persona=persona)
+        path = await generate_audio(line.get("text"), i, persona=persona, prefix=prefix)
         tts_files.append(path)
     return tts_files
 
 
-def _process_clip_to_queue(raw_path, creator_name, persona="NIGERIAN"):
-    output_filename = f"final_{creator_name}_{os.path.basename(raw_path)}"
-    output_path = os.path.join(OUTPUT_DIR, output_filename)
-
+def _analyze_clip(raw_path, persona="NIGERIAN"):
     ai_data = generate_roast(raw_path, persona=persona)
     if isinstance(ai_data, list):
         ai_data = {"script": ai_data}
@@ -400,102 +452,346 @@ def _process_clip_to_queue(raw_path, creator_name, persona="NIGERIAN"):
         elif isinstance(item, dict):
             clean_script.append(item)
     ai_data["script"] = clean_script
+    return ai_data
+
 
-    tts_files = asyncio.run(_generate_tts_files(clean_script, persona))
-    valid_tts = [f for f in tts_files if f]
-    if valid_tts and len(valid_tts) == len(clean_script):
-        apply_chaos(raw_path, ai_data, valid_tts, output_path)
+def _synthesize_tts(clean_script, persona="NIGERIAN", prefix=None):
+    return asyncio.run(_generate_tts_files(clean_script, persona, prefix=prefix))
 
-    if os.path.exists(raw_path):
+
+def _cleanup_files(raw_path, tts_files):
+    if raw_path and os.path.exists(raw_path):
         os.remove(raw_path)
 
-    for f in tts_files:
+    for f in tts_files or []:
         if f and os.path.exists(f):
             os.remove(f)
 
+
+def _render_clip(raw_path, creator_name, ai_data, tts_files, farm=None):
+    output_filename = f"final_{creator_name}_{os.path.basename(raw_path)}"
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+
+    try:
+        valid_tts = [f for f in tts_files if f]
+        if valid_tts and len(valid_tts) == len(ai_data["script"]):
+            if farm:
+                farm.render(raw_path, ai_data, valid_tts, output_path)
+            else:
+                apply_chaos(raw_path, ai_data, valid_tts, output_path)
+    finally:
+        _cleanup_files(raw_path, tts_files)
+
     if os.path.exists(output_path):
         add_video_to_queue(output_path, creator_name)
         return output_path
     return None
 
 
-def discover_and_queue(dry_run=True, produce=True, target_count=DISCOVERY_TARGET_COUNT):
-    candidates = []
-    creators = []
-    if DISCOVERY_USE_TWITCH:
-        creators = _discover_twitch_creators(
-            DISCOVERY_LOOKBACK_HOURS,
-            TWITCH_FOLLOWER_MAX,
-            DISCOVERY_UNIQUE_DAYS,
-            TWITCH_STREAMS_PAGES,
-            TWITCH_STREAMS_PER_PAGE,
-        )
+def _process_clip_to_queue(raw_path, creator_name, persona="NIGERIAN"):
+    ai_data = _analyze_clip(raw_path, persona=persona)
+    tts_files = _synthesize_tts(ai_data["script"], persona)
+    return _render_clip(raw_path, creator_name, ai_data, tts_files)
 
-    random.shuffle(creators)
-    selected = []
-    used_creators = set()
 
-    for creator in creators:
-        if len(selected) >= target_count:
-            break
+def _mark_used(job):
+    c = job["candidate"]
+    mark_creator_used(c["platform"], c["creator_id"], c["creator_name"])
+    mark_clip_used(c["platform"], c["clip_id"], c["clip_url"], c["creator_id"])
+    if job.get("fingerprint") is not None:
+        persist_fingerprint(job["fingerprint"], c["platform"], c["clip_id"], c["creator_id"])
+        get_fingerprint_index().add(job["fingerprint"], c["platform"], c["clip_id"])
 
-        creator_id = creator["creator_id"]
-        creator_name = creator["creator_name"]
-        if creator_id in used_creators:
-            continue
 
-        # Prefer Twitch clips for that creator.
-        if DISCOVERY_USE_TWITCH:
-            clips = _discover_twitch_clips_for_creator(
-                creator_id,
-                creator_name,
-                DISCOVERY_LOOKBACK_HOURS,
-                DISCOVERY_UNIQUE_DAYS,
+def _is_duplicate(job, batch):
+    """
+    Fingerprint a downloaded clip and check it against everything we have
+    shipped, then against clips earlier in this batch (`batch`, a
+    per-batch FingerprintIndex). Only clips we already shipped get their
+    clip id marked used; a batch match may yet fail to ship.
+    """
+    c = job["candidate"]
+    try:
+        fingerprint = compute_fingerprint(job["raw_path"])
+    except Exception as e:
+        print(f"   [WARN] Fingerprint failed for {c['clip_url']}: {e}")
+        return False
+    job["fingerprint"] = fingerprint
+    if fingerprint is None:
+        return False
+
+    shipped = get_fingerprint_index().find_duplicate(fingerprint)
+    match = shipped or batch.check_and_add(fingerprint, c["platform"], c["clip_id"])
+    if not match:
+        return False
+    share, (platform, clip_id) = match
+    print(f"   [DEDUPE] {c['clip_url']} matches {platform}:{clip_id} ({share:.0%} of overlap); skipping")
+    if shipped:
+        mark_clip_used(c["platform"], c["clip_id"], c["clip_url"], c["creator_id"])
+    _cleanup_files(job["raw_path"], None)
+    return True
+
+
+def _prescreen(job):
+    """
+    Cheap local motion/audio screen. Returns "pass", "weak" or "reject";
+    rejected clips are deleted and their clip id marked used.
+    """
+    c = job["candidate"]
+    try:
+        job["screen"] = screen_and_record(job["raw_path"], c)
+    except Exception as e:
+        print(f"   [WARN] Pre-screen failed for {c['clip_url']}: {e}")
+        return "pass"
+    verdict = job["screen"]["verdict"]
+    if verdict == "reject":
+        mark_clip_used(c["platform"], c["clip_id"], c["clip_url"], c["creator_id"])
+        _cleanup_files(job["raw_path"], None)
+    return verdict
+
+
+def _take_deferred(deferred, shipped, wanted):
+    """
+    Weak clips, best screen score first, only as many as we're short by.
+    The rest are deleted.
+    """
+    deferred = sorted(deferred, key=lambda j: j["screen"]["score"], reverse=True)
+    gap = max(0, wanted - shipped)
+    for job in deferred[gap:]:
+        print(f"   [SCREEN] Dropping weak clip {job['candidate']['clip_url']}")
+        _cleanup_files(job["raw_path"], None)
+    return deferred[:gap]
+
+
+def _produce_pipelined(jobs, produce=True, persona="NIGERIAN", stage_workers=None, farm=None):
+    """
+    Run download -> dedupe -> screen -> Gemini -> TTS -> render as
+    overlapping stages, so clip N renders while N+1 is analysed and N+2
+    downloads. With a RenderFarm, one render thread per farm worker hands
+    clips to separate render processes.
+    """
+    workers = dict(PIPELINE_STAGE_WORKERS, **(stage_workers or {}))
+    if farm:
+        workers["render"] = farm.workers
+
+    def download(job):
+        dl = download_clip(job["candidate"]["clip_url"], job["raw_path"])
+        print(f"   [DL] {job['candidate']['clip_url']} | {dl['seconds']:.1f}s | {dl['mb_per_s']:.2f} MB/s")
+        return job if dl["path"] else None
+
+    batch = FingerprintIndex(load=False)
+
+    def dedupe(job):
+        return None if _is_duplicate(job, batch) else job
+
+    deferred = []
+
+    def screen(job):
+        verdict = _prescreen(job)
+        if verdict == "weak":
+            deferred.append(job)
+            return None
+        return job if verdict == "pass" else None
+
+    def analyze(job):
+        job["ai_data"] = _analyze_clip(job["raw_path"], persona=persona)
+        return job
+
+    def tts(job):
+        job["tts_files"] = _synthesize_tts(job["ai_data"]["script"], persona, prefix=job["key"])
+        return job
+
+    def render(job):
+        output = _render_clip(job["raw_path"], job["safe_creator"], job["ai_data"], job["tts_files"], farm=farm)
+        if not output:
+            return None
+        _mark_used(job)
+        return job
+
+    def mark_only(job):
+        _mark_used(job)
+        return job
+
+    def on_error(stage, job, exc):
+        _cleanup_files(job.get("raw_path"), job.get("tts_files"))
+
+    stages = [
+        ("download", download, workers["download"]),
+        ("dedupe", dedupe, workers["dedupe"]),
+        ("screen", screen, workers["screen"]),
+    ]
+    if produce:
+        produce_stages = [
+            ("analyze", analyze, workers["analyze"]),
+            ("tts", tts, workers["tts"]),
+            ("render", render, workers["render"]),
+        ]
+    else:
+        produce_stages = [("mark", mark_only, 1)]
+
+    done, _ = run_pipeline(jobs, stages + produce_stages, on_error=on_error)
+
+    # Weak clips only get produced if the strong ones left us short.
+    retry = _take_deferred(deferred, len(done), len(jobs))
+    if retry:
+        print(f"   [SCREEN] Producing {len(retry)} weak clip(s) to fill the batch")
+        more, _ = run_pipeline(retry, produce_stages, on_error=on_error)
+        done += more
+    return done
+
+
+def iter_candidates(concurrency=DISCOVERY_CONCURRENCY):
+    """
+    Lazily yield clip candidates, Twitch clips first, then YouTube Shorts
+    for creators that had none. Creators are pulled one wave of
+    `concurrency` at a time and nothing is fetched beyond what the caller
+    consumes, so closing the generator stops paging and lookups.
+    """
+    if not DISCOVERY_USE_TWITCH:
+        return
+
+    creators = iter_twitch_creators(
+        DISCOVERY_LOOKBACK_HOURS,
+        TWITCH_FOLLOWER_MAX,
+        DISCOVERY_UNIQUE_DAYS,
+        TWITCH_STREAMS_PAGES,
+        TWITCH_STREAMS_PER_PAGE,
+        concurrency=concurrency,
+        shuffle=True,
+    )
+    youtube = None
+    wave_size = max(1, concurrency)
+    try:
+        while True:
+            wave = list(itertools.islice(creators, wave_size))
+            if not wave:
+                break
+
+            wave_clips = _fan_out(
+                lambda c: _discover_twitch_clips_for_creator(
+                    c["creator_id"],
+                    c["creator_name"],
+                    DISCOVERY_LOOKBACK_HOURS,
+                    DISCOVERY_UNIQUE_DAYS,
+                ),
+                wave,
+                concurrency=concurrency,
             )
-            random.shuffle(clips)
-            for c in clips:
-                if len(selected) >= target_count:
-                    break
-                if c["creator_id"] in used_creators:
+
+            # Prefer Twitch clips for each creator.
+            for creator, clips in zip(wave, wave_clips):
+                random.shuffle(clips)
+                for c in clips:
+                    c["viewer_count"] = creator["viewer_count"]
+                    c["follower_total"] = creator["follower_total"]
+                    yield c
+
+            # YouTube Shorts for the wave's creators without Twitch clips,
+            # batched into shared search/videos/channels calls.
+            if DISCOVERY_USE_YOUTUBE:
+                names = [c["creator_name"] for c, clips in zip(wave, wave_clips) if not clips]
+                if names:
+                    youtube = youtube or YouTubeDiscovery()
+                    yt_by_name = youtube.discover(
+                        names,
+                        DISCOVERY_LOOKBACK_HOURS,
+                        YOUTUBE_SUB_MAX,
+                        DISCOVERY_UNIQUE_DAYS,
+                    )
+                    for name in names:
+                        yt_clips = yt_by_name.get(name, [])
+                        random.shuffle(yt_clips)
+                        yield from yt_clips
+    finally:
+        creators.close()
+        if youtube:
+            youtube.report()
+
+
+def discover_and_queue(dry_run=True, produce=True, target_count=DISCOVERY_TARGET_COUNT,
+                       concurrency=DISCOVERY_CONCURRENCY, download_workers=DOWNLOAD_WORKERS,
+                       pipeline=DISCOVERY_PIPELINE, rank=DISCOVERY_RANKING,
+                       render_farm=DISCOVERY_RENDER_FARM):
+    # With ranking we gather a larger pool (every clip of each creator) and
+    # keep the top target_count; without it, the first clip per creator wins.
+    pool_creators = target_count * RANKING_POOL_FACTOR if rank else target_count
+    pool = []
+    pool_creator_ids = set()
+
+    # Stop pulling (and stop paging / follower lookups) once the pool is full.
+    if target_count > 0:
+        candidates = iter_candidates(concurrency=concurrency)
+        try:
+            for c in candidates:
+                if c["creator_id"] in pool_creator_ids and not rank:
                     continue
-                selected.append(c)
-                used_creators.add(c["creator_id"])
-
-        # If still short, try YouTube Shorts for that creator name.
-        if DISCOVERY_USE_YOUTUBE and len(selected) < target_count:
-            yt_clips = _discover_youtube_shorts(
-                DISCOVERY_LOOKBACK_HOURS,
-                YOUTUBE_SUB_MAX,
-                DISCOVERY_UNIQUE_DAYS,
-                query=creator_name,
-            )
-            random.shuffle(yt_clips)
-            for c in yt_clips:
-                if len(selected) >= target_count:
+                if c["creator_id"] not in pool_creator_ids and len(pool_creator_ids) >= pool_creators:
                     break
-                if c["creator_id"] in used_creators:
-                    continue
-                selected.append(c)
-                used_creators.add(c["creator_id"])
+                pool.append(c)
+                pool_creator_ids.add(c["creator_id"])
+                if not rank and len(pool) >= target_count:
+                    break
+        finally:
+            candidates.close()
+
+    if rank:
+        selected = rank_candidates(pool, top_k=target_count)
+        print(f"\n🏆 Ranked {len(pool)} candidates from {len(pool_creator_ids)} creators:")
+        for c in selected:
+            print(f"  {c['score']:+.2f} | {c['platform']} | {c['creator_name']} | {c.get('view_count', 0)} views")
+    else:
+        selected = pool[:target_count]
+    print(f"\n✅ Selected {len(selected)} clips.\n")
 
     if dry_run:
         return selected
 
-    for c in selected:
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jobs = []
+    for i, c in enumerate(selected):
         safe_creator = _safe_filename(c["creator_name"])
-        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_name = f"{c['platform']}_{safe_creator}_{stamp}.mp4"
-        raw_path = os.path.join(INPUT_DIR, raw_name)
-        downloaded = _download_with_ytdlp(c["clip_url"], raw_path)
-        if not downloaded:
-            continue
-
-        produced_ok = True
-        if produce:
-            produced_ok = _process_clip_to_queue(downloaded, safe_creator) is not None
+        key = f"{c['platform']}_{safe_creator}_{stamp}_{i}"
+        jobs.append({
+            "candidate": c,
+            "key": key,
+            "safe_creator": safe_creator,
+            "raw_path": os.path.join(INPUT_DIR, f"{key}.mp4"),
+        })
 
-        if produced_ok:
-            mark_creator_used(c["platform"], c["creator_id"], c["creator_name"])
-            mark_clip_used(c["platform"], c["clip_id"], c["clip_url"], c["creator_id"])
+    if pipeline:
+        if produce and render_farm and jobs:
+            with RenderFarm() as farm:
+                _produce_pipelined(jobs, produce=produce, stage_workers={"download": download_workers}, farm=farm)
+        else:
+            _produce_pipelined(jobs, produce=produce, stage_workers={"download": download_workers})
+        return selected
 
-    return selected
\ No newline at end of file
+    downloads = download_all([(j["candidate"]["clip_url"], j["raw_path"]) for j in jobs], workers=download_workers)
+    ready, deferred = [], []
+    batch = FingerprintIndex(load=False)
+    for job, dl in zip(jobs, downloads):
+        if not dl["path"] or _is_duplicate(job, batch):
+            continue
+        verdict = _prescreen(job)
+        if verdict == "pass":
+            ready.append(job)
+        elif verdict == "weak":
+            deferred.append(job)
+
+    def produce_all(batch):
+        shipped = 0
+        for job in batch:
+            produced_ok = True
+            if produce:
+                produced_ok = _process_clip_to_queue(job["raw_path"], job["safe_creator"]) is not None
+
+            if produced_ok:
+                _mark_used(job)
+                shipped += 1
+        return shipped
+
+    # Weak clips only get produced if the strong ones left us short.
+    shipped = produce_all(ready)
+    produce_all(_take_deferred(deferred, shipped, len(jobs)))
+
+    return selected
@@ -0,0 +1,97 @@
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Parallel yt-dlp downloads per batch.
+DOWNLOAD_WORKERS = 4
+# Extra attempts after the first failure, with exponential backoff.
+DOWNLOAD_RETRIES = 2
+DOWNLOAD_BACKOFF_SECONDS = 2.0
+
+
+def download_with_ytdlp(url, output_path):
+    try:
+        import yt_dlp
+    except Exception:
+        print("yt-dlp not installed; skipping download.")
+        return None
+
+    ydl_opts = {
+        "outtmpl": output_path,
+        "format": "mp4/best",
+        "quiet": True,
+        "no_warnings": True,
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+        return output_path if os.path.exists(output_path) else None
+    except Exception as e:
+        print(f"Download failed for {url}: {e}")
+        return None
+
+
+def _ytdlp_available():
+    try:
+        import yt_dlp  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def download_clip(url, output_path, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF_SECONDS):
+    """
+    Download one clip, retrying with exponential backoff + jitter.
+    Returns a stats dict: url, path (None on failure), attempts, seconds,
+    bytes and mb_per_s.
+    """
+    started = time.monotonic()
+    attempts = 0
+    path = None
+    for attempt in range(retries + 1):
+        attempts += 1
+        path = download_with_ytdlp(url, output_path)
+        if path or not _ytdlp_available():
+            break
+        if attempt < retries:
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff / 2)
+            print(f"   [RETRY] {url} in {delay:.1f}s (attempt {attempts + 1}/{retries + 1})")
+            time.sleep(delay)
+
+    seconds = time.monotonic() - started
+    size = os.path.getsize(path) if path and os.path.exists(path) else 0
+    return {
+        "url": url,
+        "path": path,
+        "attempts": attempts,
+        "seconds": seconds,
+        "bytes": size,
+        "mb_per_s": (size / 1e6) / seconds if seconds > 0 else 0.0,
+    }
+
+
+def download_all(jobs, workers=DOWNLOAD_WORKERS, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF_SECONDS):
+    """
+    Download (url, output_path) jobs on a bounded pool.
+    Returns one stats dict per job, in job order.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        results = list(pool.map(lambda job: download_clip(job[0], job[1], retries, backoff), jobs))
+    wall = time.monotonic() - started
+
+    for r in results:
+        status = "OK" if r["path"] else "FAILED"
+        print(
+            f"   [DL] {status} {r['url']} | {r['seconds']:.1f}s | "
+            f"{r['bytes'] / 1e6:.1f} MB | {r['mb_per_s']:.2f} MB/s | attempts={r['attempts']}"
+        )
+    serial = sum(r["seconds"] for r in results)
+    ok = sum(1 for r in results if r["path"])
+    print(f"   [DL] {ok}/{len(results)} downloaded in {wall:.1f}s wall ({serial:.1f}s if run serially)")
+    return results
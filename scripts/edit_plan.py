@@ -0,0 +1,133 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from .config import TEMP_DIR
+
+# Bump when the plan layout changes so old markers stop matching.
+PLAN_VERSION = 2
+# Render markers: the hash + plan each output was last rendered from.
+EDL_DIR = os.path.join(TEMP_DIR, "edl")
+
+
+def plan_seed(video_path, ai_data):
+    """
+    Default seed for a plan: stable for the same clip and script, different
+    across clips.
+    """
+    key = json.dumps(
+        {"clip": os.path.basename(video_path), "script": ai_data.get("script", [])},
+        sort_keys=True,
+    )
+    return int(hashlib.sha256(key.encode("utf-8")).hexdigest()[:16], 16)
+
+
+def _plan_paths(plan):
+    paths = {plan["source"]}
+    for item in plan["layers"] + plan["audio"]:
+        if item.get("path"):
+            paths.add(item["path"])
+    return sorted(paths)
+
+
+def plan_hash(plan):
+    """
+    SHA-256 of the canonical plan JSON plus the size/mtime of every file it
+    references, so swapping an asset in place also invalidates the render.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(plan, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for path in _plan_paths(plan):
+        try:
+            st = os.stat(path)
+            digest.update(f"{path}:{st.st_size}:{int(st.st_mtime)}".encode("utf-8"))
+        except OSError:
+            digest.update(f"{path}:missing".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_plan(plan, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, sort_keys=True)
+
+
+def load_plan(path):
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version {plan.get('version')} in {path}")
+    return plan
+
+
+def _marker_path(output_path):
+    name = hashlib.sha1(os.path.abspath(output_path).encode("utf-8")).hexdigest()
+    return os.path.join(EDL_DIR, f"{name}.json")
+
+
+def is_rendered(plan, output_path):
+    """
+    True when output_path exists and was rendered from an identical plan.
+    """
+    marker = _marker_path(output_path)
+    if not (os.path.exists(output_path) and os.path.exists(marker)):
+        return False
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            return json.load(f).get("hash") == plan_hash(plan)
+    except (OSError, ValueError):
+        return False
+
+
+def record_render(plan, output_path):
+    save_plan(
+        {"hash": plan_hash(plan), "output": output_path, "plan": plan},
+        _marker_path(output_path),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan or render an edit decision list.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    plan_cmd = sub.add_parser("plan", help="Write the plan for a clip without rendering.")
+    plan_cmd.add_argument("video")
+    plan_cmd.add_argument("ai_json", help="Gemini analysis JSON (with 'script').")
+    plan_cmd.add_argument("tts", nargs="+", help="Voice files, one per script line.")
+    plan_cmd.add_argument("--out", required=True, help="Plan JSON path.")
+    plan_cmd.add_argument("--seed", type=int, default=None)
+
+    render_cmd = sub.add_parser("render", help="Render a saved plan.")
+    render_cmd.add_argument("plan")
+    render_cmd.add_argument("output")
+    render_cmd.add_argument("--backend", choices=["moviepy", "ffmpeg"], default=None)
+    render_cmd.add_argument("--force", action="store_true", help="Render even if the output is up to date.")
+    render_cmd.add_argument("--profile", default=None, help="Encode profile (fast, balanced, archival).")
+    args = parser.parse_args()
+
+    from .editor_engine import plan_edit, render_plan
+    from .encode_profiles import DEFAULT_ENCODE_PROFILE
+
+    started = time.perf_counter()
+    if args.command == "plan":
+        with open(args.ai_json, "r", encoding="utf-8") as f:
+            ai_data = json.load(f)
+        plan = plan_edit(args.video, ai_data, args.tts, seed=args.seed)
+        save_plan(plan, args.out)
+        print(f"Planned {len(plan['layers'])} layers, {len(plan['audio'])} audio cues "
+              f"in {time.perf_counter() - started:.3f}s -> {args.out} ({plan_hash(plan)[:12]})")
+        return
+
+    plan = load_plan(args.plan)
+    if not args.force and is_rendered(plan, args.output):
+        print(f"{args.output} is up to date ({plan_hash(plan)[:12]}).")
+        return
+    render_plan(plan, args.output, backend=args.backend, profile=args.profile or DEFAULT_ENCODE_PROFILE)
+    record_render(plan, args.output)
+    print(f"Rendered {args.output} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
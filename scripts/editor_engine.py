@@ -6,39 +6,43 @@ if not hasattr(PIL.Image, 'ANTIALIAS'):
 
 import os
 import random
-import numpy as np
+import time
 from moviepy.editor import (
-    VideoFileClip,
-    AudioFileClip,
-    TextClip,
+    VideoClip,
     ImageClip,
-    CompositeVideoClip,
-    CompositeAudioClip
+    CompositeVideoClip
 )
-from moviepy.video.fx.all import crop, mask_color, colorx, lum_contrast
-from .config import ASSETS_DIR, IMAGE_DIR, SFX_DIR, GREEN_SCREEN_DIR, OVERLAY_DIR
+from moviepy.audio.AudioClip import AudioArrayClip
+from moviepy.video.fx.all import crop, colorx, lum_contrast
+from .config import ASSETS_DIR
 from .asset_loader import download_image_from_google
-
-
-def get_asset_fuzzy(keyword, folder, extensions):
-    if not os.path.exists(folder):
-        return None
-
-    files = [
-        f for f in os.listdir(folder)
-        if f.lower().endswith(extensions)
-        and "jumpscare" not in f.lower()
-    ]
-
-    if not files:
-        return None
-
-    if keyword:
-        matches = [f for f in files if keyword.lower() in f.lower()]
-        if matches:
-            return os.path.join(folder, random.choice(matches))
-
-    return os.path.join(folder, random.choice(files))
+from .caption_engine import caption_position, rasterize_caption
+from .ffmpeg_tools import probe_media
+from .asset_index import get_asset_index
+from .matte_cache import get_matte
+from .asset_cache import prepare_layers
+from .audio_engine import AUDIO_SAMPLE_RATE, mix_cues
+from .media_pool import MediaPool
+from .frame_store import FrameStore, union_crop
+from .encode_profiles import DEFAULT_ENCODE_PROFILE, ENCODE_PROFILES, choose_encode_profile, x264_args
+from .db_engine import save_render_log
+from .edit_plan import PLAN_VERSION, is_rendered, plan_seed, record_render
+
+# Shorts output geometry and frame rate.
+OUTPUT_SIZE = (1080, 1920)
+OUTPUT_FPS = 24
+# Minimum gap between captions and the left/right frame edges.
+CAPTION_MARGIN = 40
+
+# "moviepy" composites in Python; "ffmpeg" runs the same edit as one filtergraph.
+RENDER_BACKEND = "moviepy"
+# Render library assets from pre-sized transcodes (asset_cache).
+USE_ASSET_CACHE = True
+# x264 threads per render (None = ffmpeg default). Render farm workers set it.
+ENCODER_THREADS = None
+
+# Standard green; threshold 110 catches most imperfections without eating the subject.
+CHROMA_KEY = {"color": [0, 255, 0], "thr": 110, "s": 5}
 
 
 def split_text_to_chunks(text, max_words=3):
@@ -57,102 +61,215 @@ def split_text_to_chunks(text, max_words=3):
     return chunks
 
 
-def smart_mask(clip):
+def matte_mask(path, key, trim, duration, offset=0.0):
     """
     Robust green screen masking.
-    Uses a standard green key and clamps values to prevent artifacts.
+    Reads the asset's precomputed, already clamped alpha matte (the
+    `duration` seconds from `trim`) from the matte cache instead of keying
+    every frame during the render. offset skips into the matte (a layer
+    continued in a later render segment).
     """
-    # Standard Green
-    green_ref = [0, 255, 0]
-    
-    # Threshold 110 catches most imperfections without eating the subject
-    masked = clip.fx(mask_color, color=green_ref, thr=110, s=5)
-    
-    return masked
-
-
-def clamp_mask(clip):
-    if clip.mask:
-        clip.mask = clip.mask.fl_image(lambda f: np.clip(f, 0, 1))
-    return clip
+    matte, fps = get_matte(path, key, trim=trim, duration=duration)
+    last = len(matte) - 1
+
+    def make_frame(t):
+        return matte[min(max(int((t + offset) * fps + 1e-6), 0), last)] / 255.0
+
+    return VideoClip(make_frame, ismask=True, duration=max(len(matte) / fps - offset, 0))
+
+
+def _zoom_window(w, h, region_h, zoom, off_x, off_y):
+    """
+    Source rect shown by a zoom patch: the frame scaled by `zoom` and
+    cropped to (w, region_h) around (w/2 + off_x, region_h/2 + off_y),
+    mapped back to source pixels and kept inside the frame.
+    """
+    cw, ch = w / zoom, region_h / zoom
+    x1 = min(max((w / 2 + off_x) / zoom - cw / 2, 0), w - cw)
+    y1 = min(max((region_h / 2 + off_y) / zoom - ch / 2, 0), h - ch)
+    return [x1, y1, x1 + cw, y1 + ch]
+
+
+def overlay_crop(ov_size, w, overlay_h):
+    """
+    Fit the overlay to width, then center-crop it to the bottom strip
+    (None: too short, stretch instead). Source-pixel rect.
+    """
+    ow, oh = ov_size
+    if oh * w / ow <= overlay_h:
+        return None
+    src_h = overlay_h * ow / w
+    return [0, (oh - src_h) / 2, ow, (oh + src_h) / 2]
+
+
+def place_in_output(layers, w, h):
+    """
+    Canvas-space (w, h) layers moved into OUTPUT_SIZE space, dropping any
+    that fall fully outside the frame.
+    """
+    out_w, out_h = OUTPUT_SIZE
+    transform = _output_transform(w, h, out_w, out_h)
+    placed = (_to_output(layer, transform, out_w, out_h) for layer in layers)
+    return [layer for layer in placed if layer]
+
+
+def _image_size(path):
+    try:
+        with PIL.Image.open(path) as img:
+            size = img.size
+            img.verify()
+        return size
+    except Exception as e:
+        print(f"[WARN] Skipping bad image {path}: {e}")
+        return None
+
+
+def _output_transform(w, h, out_w, out_h):
+    """
+    (sx, sy, off_x) taking canvas pixels to output pixels: scale to the
+    output height and center-crop the width, or stretch if too narrow.
+    """
+    scale = out_h / h
+    if w * scale > out_w:
+        return scale, scale, (w * scale - out_w) / 2
+    return out_w / w, scale, 0.0
+
+
+def _to_output(layer, transform, out_w, out_h):
+    """
+    Move a canvas-space layer into output space. Video/image boxes are
+    clipped to the visible frame and their source crop shrunk to match, so
+    each layer is scaled exactly once, straight to its final placement.
+    Returns None for layers that end up fully off-screen.
+    """
+    sx, sy, off_x = transform
+    if layer["kind"] == "text":
+        x_center, top = layer["anchor"]
+        return dict(
+            layer,
+            anchor=[x_center * sx - off_x, top * sy],
+            fontsize=int(round(layer["fontsize"] * sy)),
+            width=int(min(layer["width"] * sx, out_w - 2 * CAPTION_MARGIN)),
+        )
+
+    x, y, bw, bh = layer["box"]
+    ox, oy, ow, oh = x * sx - off_x, y * sy, bw * sx, bh * sy
+    x1, y1 = max(int(round(ox)), 0), max(int(round(oy)), 0)
+    x2, y2 = min(int(round(ox + ow)), out_w), min(int(round(oy + oh)), out_h)
+    if x2 <= x1 or y2 <= y1:
+        return None
 
+    cx1, cy1, cx2, cy2 = layer.get("crop") or [0, 0, *layer["src_size"]]
+    fx, fy = (cx2 - cx1) / ow, (cy2 - cy1) / oh
+    crop_rect = [
+        cx1 + (x1 - ox) * fx,
+        cy1 + (y1 - oy) * fy,
+        cx1 + (x2 - ox) * fx,
+        cy1 + (y2 - oy) * fy,
+    ]
+    if crop_rect == [0, 0, *layer["src_size"]]:
+        crop_rect = None
+    return dict(layer, crop=crop_rect, box=[x1, y1, x2 - x1, y2 - y1])
+
+
+def plan_edit(video_path, ai_data, tts_files, seed=None):
+    """
+    Make every creative decision for a video (overlay, zoom patches, green
+    screens, images, captions, jumpscare, SFX, adlib) without decoding any
+    media. The plan is plain JSON-able data in output (OUTPUT_SIZE) pixels:
+
+    layers: bottom-to-top video/image/text layers with a box [x, y, w, h],
+            start/duration, and for video/image the source size and crop
+            rect plus (video) loop flag, effects and chroma key.
+    audio:  cues with path, start, source offset and gain.
 
-def apply_chaos(video_path, ai_data, tts_files, output_path):
+    Every random pick comes from one Random(seed), so the same clip, script
+    and seed always give the same plan.
+    """
     roast_script = ai_data.get("script", [])
-    print("--- Editing: ADLIB + NO FLASH FIX + ROBUST GREEN SCREEN ---")
+    if seed is None:
+        seed = plan_seed(video_path, ai_data)
+    rng = random.Random(seed)
+    assets = get_asset_index()
 
-    base_clip = VideoFileClip(video_path)
-    original_duration = base_clip.duration
-    w, h = base_clip.size
+    base_info = probe_media(video_path)
+    original_duration = base_info["duration"]
+    w, h = base_info["size"]
 
     # --- 70/30 SPLIT ---
     split_h = int(h * 0.7)
     overlay_h = h - split_h
 
-    overlay_clip = None
-    if os.path.exists(OVERLAY_DIR):
-        overlays = [f for f in os.listdir(OVERLAY_DIR) if f.endswith(('.mp4', '.mov'))]
-        if overlays and original_duration > 5:
-            ov_path = os.path.join(OVERLAY_DIR, random.choice(overlays))
-            overlay_clip = VideoFileClip(ov_path)
-
-            overlay_clip = (
-                overlay_clip.loop(duration=original_duration)
-                if overlay_clip.duration < original_duration
-                else overlay_clip.subclip(0, original_duration)
-            )
-
-            overlay_clip = overlay_clip.resize(width=w)
-            overlay_clip = (
-                crop(
-                    overlay_clip,
-                    x1=0,
-                    x2=w,
-                    y_center=overlay_clip.size[1] / 2,
-                    height=overlay_h
-                )
-                if overlay_clip.size[1] > overlay_h
-                else overlay_clip.resize((w, overlay_h))
-            )
+    overlay_layer = None
+    overlays = assets.files("overlay")
+    if overlays and original_duration > 5:
+        ov_path = rng.choice(overlays)
+        ov_info = assets.meta(ov_path)
+        ov_crop = overlay_crop(ov_info["size"], w, overlay_h)
+
+        overlay_layer = {
+            "kind": "video",
+            "role": "overlay",
+            "path": ov_path,
+            "src_size": list(ov_info["size"]),
+            "src_start": 0.0,
+            "loop": ov_info["duration"] < original_duration,
+            "crop": ov_crop,
+            "box": [0, split_h, w, overlay_h],
+            "start": 0.0,
+            "duration": original_duration,
+        }
+
+    base_h = split_h if overlay_layer else h
+    layers = [{
+        "kind": "video",
+        "role": "base",
+        "path": video_path,
+        "src_size": [w, h],
+        "src_start": 0.0,
+        "crop": [0, 0, w, base_h] if overlay_layer else None,
+        "box": [0, 0, w, base_h],
+        "start": 0.0,
+        "duration": original_duration,
+    }]
+    if overlay_layer:
+        layers.append(overlay_layer)
+
+    audio = []
+    if base_info["has_audio"]:
+        audio.append({"role": "base", "path": video_path, "start": 0.0, "gain": 0.6})
 
-            overlay_clip = overlay_clip.set_position(('center', 'bottom'))
-            base_clip = crop(base_clip, x1=0, x2=w, y1=0, y2=split_h)
+    last_audio_end = 0.0
 
-    visual_layers = [base_clip.set_position(('center', 'top'))]
-    if overlay_clip:
-        visual_layers.append(overlay_clip)
+    image_deck = assets.files("image")
+    rng.shuffle(image_deck)
 
-    voice_clips, sfx_clips = [], []
-    last_audio_end = 0.0
+    sfxs = [f for f in assets.files("sfx") if "adlib" not in os.path.basename(f)]
 
-    image_deck = []
-    if os.path.exists(IMAGE_DIR):
-        image_deck = [
-            os.path.join(IMAGE_DIR, f)
-            for f in os.listdir(IMAGE_DIR)
-            if f.endswith(('jpg', 'png'))
-        ]
-        random.shuffle(image_deck)
+    font_path = os.path.join(ASSETS_DIR, "font", "Impact.ttf")
+    if not os.path.exists(font_path):
+        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 
     # --- JUMPSCARE ---
-    js_clip = None
+    js_layer = None
     jumpscare_path = os.path.join(ASSETS_DIR, "jumpscare.mov")
-    jumpscare_time = random.uniform(original_duration * 0.2, original_duration * 0.8)
-
-    if os.path.exists(jumpscare_path):
-        raw_js = VideoFileClip(jumpscare_path)
-        js_dur = min(1.5, raw_js.duration)
-
-        js_clip = (
-            raw_js
-            .resize((w, h))
-            .set_start(jumpscare_time)
-            .set_duration(js_dur)
-            .set_position('center')
-        )
-
-        if raw_js.audio:
-            sfx_clips.append(raw_js.audio.set_start(jumpscare_time).volumex(2.0))
+    jumpscare_time = rng.uniform(original_duration * 0.2, original_duration * 0.8)
+
+    if jumpscare_path in assets.files("assets"):
+        js_info = assets.meta(jumpscare_path)
+        js_layer = {
+            "kind": "video",
+            "role": "jumpscare",
+            "path": jumpscare_path,
+            "src_size": list(js_info["size"]),
+            "src_start": 0.0,
+            "crop": None,
+            "box": [0, 0, w, h],
+            "start": jumpscare_time,
+            "duration": min(1.5, js_info["duration"]),
+        }
+        if js_info["has_audio"]:
+            audio.append({"role": "jumpscare", "path": jumpscare_path, "start": jumpscare_time, "gain": 2.0})
 
     # --- SCRIPT PROCESSING ---
     for i, line in enumerate(roast_script):
@@ -162,63 +279,60 @@ def apply_chaos(video_path, ai_data, tts_files, output_path):
         visual_query = line.get("visual_search", "")
         visual_effect = line.get("visual_effect", "")
 
-        voice = AudioFileClip(tts_files[i])
-        voice_dur = voice.duration
+        voice_dur = probe_media(tts_files[i])["duration"]
 
         start_time = max(target_time, last_audio_end + 0.1)
         if start_time + voice_dur > original_duration:
             continue
 
         last_audio_end = start_time + voice_dur
-        voice_clips.append(voice.set_start(start_time).volumex(1.6))
-
-        patch_clip = base_clip.subclip(start_time, start_time + min(1.0, voice_dur))
+        audio.append({"role": "voice", "path": tts_files[i], "start": start_time, "gain": 1.6})
 
+        # --- ZOOM PATCH ---
         # Fix: Disable background flash if visual effect is active
+        effects = []
         if (mood == "scream" or "!" in text) and not visual_effect:
-            patch_clip = patch_clip.fx(colorx, 3.0).fx(lum_contrast, 0, 20)
-            off_x, off_y = random.randint(-40, 40), random.randint(-20, 20)
+            effects.append("flash")
+            zoom = 1.4
+            off_x, off_y = rng.randint(-40, 40), rng.randint(-20, 20)
         else:
-            off_x, off_y = random.randint(-15, 15), random.randint(-10, 10)
-            patch_clip = patch_clip.resize(1.3)
-
-        patch_clip = (
-            patch_clip
-            .resize(1.4)
-            .fx(
-                crop,
-                x_center=w / 2 + off_x,
-                y_center=split_h / 2 + off_y,
-                width=w,
-                height=split_h
-            )
-        )
-
-        visual_layers.append(
-            patch_clip
-            .set_start(start_time)
-            .set_position(('center', 'top'))
-        )
+            zoom = 1.3 * 1.4
+            off_x, off_y = rng.randint(-15, 15), rng.randint(-10, 10)
+
+        layers.append({
+            "kind": "video",
+            "role": "patch",
+            "path": video_path,
+            "src_size": [w, h],
+            "src_start": start_time,
+            "crop": _zoom_window(w, base_h, split_h, zoom, off_x, off_y),
+            "box": [0, 0, w, split_h],
+            "start": start_time,
+            "duration": min(1.0, voice_dur),
+            "effects": effects,
+        })
 
         # --- GREEN SCREEN VFX ---
-        if visual_effect and random.random() < 0.9:
-            gs_path = get_asset_fuzzy(visual_effect, GREEN_SCREEN_DIR, ('.mp4', '.mov'))
+        if visual_effect and rng.random() < 0.9:
+            gs_path = assets.pick("greenscreen", visual_effect, rng)
             if gs_path and not (jumpscare_time - 1 < start_time < jumpscare_time + 1):
-                gs_clip = VideoFileClip(gs_path)
-                
+                gs_info = assets.meta(gs_path)
+                gs_dur = gs_info["duration"]
+
                 # Fix: Trim start frames to avoid white flashes
-                if gs_clip.duration > 0.2:
-                    gs_clip = gs_clip.subclip(0.1)
-
-                gs_clip = clamp_mask(smart_mask(gs_clip))
-                gs_clip = (
-                    gs_clip
-                    .resize((w, h))
-                    .set_start(start_time)
-                    .set_duration(min(1.5, gs_clip.duration))
-                    .set_position('center')
-                )
-                visual_layers.append(gs_clip)
+                trim = 0.1 if gs_dur > 0.2 else 0.0
+                layers.append({
+                    "kind": "video",
+                    "role": "greenscreen",
+                    "path": gs_path,
+                    "src_size": list(gs_info["size"]),
+                    "src_start": trim,
+                    "crop": None,
+                    "box": [0, 0, w, h],
+                    "start": start_time,
+                    "duration": min(1.5, gs_dur - trim),
+                    "chroma_key": dict(CHROMA_KEY),
+                })
 
         # --- IMAGES ---
         if not visual_effect:
@@ -233,113 +347,232 @@ def apply_chaos(video_path, ai_data, tts_files, output_path):
                     else image_deck.pop(0) if image_deck else None
                 )
 
-                if img_path:
-                    try:
-                        visual_layers.append(
-                            ImageClip(img_path)
-                            .resize((w, h))
-                            .set_start(image_start)
-                            .set_duration(0.6)
-                            .set_position('center')
-                        )
-                    except Exception as e:
-                        print(f"[WARN] Skipping bad image {img_path}: {e}")
+                img_size = _image_size(img_path) if img_path else None
+                if img_size:
+                    layers.append({
+                        "kind": "image",
+                        "path": img_path,
+                        "src_size": list(img_size),
+                        "crop": None,
+                        "box": [0, 0, w, h],
+                        "start": image_start,
+                        "duration": 0.6,
+                    })
 
         # --- TEXT ---
-    chunks = split_text_to_chunks(text)
-    for k, chunk in enumerate(chunks):
-        # 1. Setup Font (Done BEFORE creating the clip)
-        font_path = os.path.join(ASSETS_DIR, "font", "Impact.ttf")
-        if not os.path.exists(font_path):
-            font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-
-        # 2. Create the Text Clip - FIXED VERSION
-        txt_clip = (TextClip(
-                chunk,
-                font=font_path,
-                fontsize=60,
-                color='yellow',
-                stroke_color='yellow',  # Same as text color
-                stroke_width=0,  # No outline
-                method='caption',
-                size=(w - 100, None),
-                align='center'
-            )
-            .set_position(('center', 0.75), relative=True)
-            .set_start(start_time + k * (voice_dur / len(chunks)))
-            .set_duration(voice_dur / len(chunks)))
-
-        # 3. Add to list
-        visual_layers.append(txt_clip)
+        chunks = split_text_to_chunks(text)
+        for k, chunk in enumerate(chunks):
+            layers.append({
+                "kind": "text",
+                "text": chunk,
+                "font": font_path,
+                "fontsize": 60,
+                "color": "yellow",
+                "width": w - 100,
+                # Centered horizontally, top edge at 75% of the frame
+                "anchor": [w / 2, 0.75 * h],
+                "start": start_time + k * (voice_dur / len(chunks)),
+                "duration": voice_dur / len(chunks),
+            })
+
         # --- SFX ---
-        if os.path.exists(SFX_DIR):
-            sfxs = [
-                f for f in os.listdir(SFX_DIR)
-                if f.endswith('mp3') and "adlib" not in f
-            ]
-            if sfxs:
-                sfx_clips.append(
-                    AudioFileClip(os.path.join(SFX_DIR, random.choice(sfxs)))
-                    .set_start(start_time)
-                    .volumex(0.95)
-                )
-                sfx_clips.append(
-                    AudioFileClip(os.path.join(SFX_DIR, random.choice(sfxs)))
-                    .set_start(start_time + 0.2)
-                    .volumex(0.7)
-                )
-                if random.random() < 0.5:
-                    sfx_clips.append(
-                        AudioFileClip(os.path.join(SFX_DIR, random.choice(sfxs)))
-                        .set_start(start_time + 0.45)
-                        .volumex(0.6)
-                    )
+        if sfxs:
+            audio.append({"role": "sfx", "path": rng.choice(sfxs), "start": start_time, "gain": 0.95})
+            audio.append({"role": "sfx", "path": rng.choice(sfxs), "start": start_time + 0.2, "gain": 0.7})
+            if rng.random() < 0.5:
+                audio.append({"role": "sfx", "path": rng.choice(sfxs), "start": start_time + 0.45, "gain": 0.6})
 
-    if js_clip:
-        visual_layers.append(js_clip)
+    if js_layer:
+        layers.append(js_layer)
 
     # ==========================================
     # === ADD ADLIB AT THE END ===
     # ==========================================
     # Look for a file containing "adlib" in the ASSETS folder
-    adlib_path = get_asset_fuzzy("adlib", ASSETS_DIR, ('.mp3', '.wav'))
-    
+    adlib_path = assets.pick("assets", "adlib", rng, extensions=('.mp3', '.wav'))
+
     if adlib_path:
-        adlib_clip = AudioFileClip(adlib_path)
         # Calculate start time so it ends exactly when the video ends
-        adlib_start = max(0, original_duration - adlib_clip.duration)
-        
+        adlib_start = max(0, original_duration - assets.meta(adlib_path)["duration"])
         print(f"Adding adlib at {adlib_start:.2f}s")
-        sfx_clips.append(
-            adlib_clip
-            .set_start(adlib_start)
-            .volumex(1.2) # Slightly louder to be heard over outro
-        )
+        # Slightly louder to be heard over outro
+        audio.append({"role": "adlib", "path": adlib_path, "start": adlib_start, "gain": 1.2})
     # ==========================================
 
-    final_video = CompositeVideoClip(visual_layers, size=(w, h))
-    final_audio = CompositeAudioClip(
-        [base_clip.audio.volumex(0.6)] + voice_clips + sfx_clips
+    # Lay out in final 9:16 pixels so nothing is rescaled after compositing.
+    layers = place_in_output(layers, w, h)
+    out_w, out_h = OUTPUT_SIZE
+
+    return {
+        "version": PLAN_VERSION,
+        "seed": seed,
+        "source": video_path,
+        "duration": original_duration,
+        "size": [out_w, out_h],
+        "fps": OUTPUT_FPS,
+        "layers": layers,
+        "audio": audio,
+    }
+
+
+def _reads_store(layer, source):
+    # Straight cuts of the source clip; looped or keyed layers keep a reader.
+    return (
+        layer["kind"] == "video" and layer["path"] == source
+        and not layer.get("loop") and not layer.get("chroma_key")
     )
 
-    final_video.audio = final_audio.set_duration(original_duration)
-    final_video.set_duration(original_duration)
-
-    # Force 9:16 output for Shorts
-    target_w, target_h = 1080, 1920
-    if (w, h) != (target_w, target_h):
-        # Resize to match height, then crop to 9:16 centered
-        resized = final_video.resize(height=target_h)
-        rw, rh = resized.size
-        if rw > target_w:
-            resized = crop(resized, x_center=rw / 2, y_center=rh / 2, width=target_w, height=target_h)
+
+def _stored_clip(layer, store):
+    """
+    Layer cut from the shared FrameStore: its crop is sliced out of the
+    store's (union-cropped) frames instead of seeking a reader.
+    """
+    start, dur = layer["src_start"], layer["duration"]
+    sx1, sy1 = store.crop[0], store.crop[1]
+    x1, y1, x2, y2 = layer.get("crop") or [0, 0, *layer["src_size"]]
+    x1, y1 = int(round(x1)) - sx1, int(round(y1)) - sy1
+    x2, y2 = int(round(x2)) - sx1, int(round(y2)) - sy1
+
+    def make_frame(t):
+        return store.frame(start + t)[y1:y2, x1:x2]
+
+    # VideoClip(make_frame) probes frame 0 for its size, which would make
+    # the store decode out of order; the size is known from the crop.
+    clip = VideoClip(duration=dur)
+    clip.make_frame = make_frame
+    clip.size = (x2 - x1, y2 - y1)
+    return clip
+
+
+def _moviepy_video_layer(layer, open_video, store=None):
+    start, dur = layer["src_start"], layer["duration"]
+    if store is not None and _reads_store(layer, store.path):
+        clip = _stored_clip(layer, store)
+    else:
+        src = open_video(layer["path"])
+        if layer.get("loop"):
+            clip = src.loop(duration=start + dur).subclip(start, start + dur)
         else:
-            resized = resized.resize((target_w, target_h))
-        final_video = resized
-
-    final_video.write_videofile(
-        output_path,
-        fps=24,
-        codec="libx264",
-        audio_codec="aac"
+            clip = src.subclip(start, min(start + dur, src.duration))
+
+        key = layer.get("chroma_key")
+        if key:
+            # key_trim/key_duration: the whole layer's matte when it was split mid-way.
+            trim = layer.get("key_trim", layer["src_start"])
+            key_duration = layer.get("key_duration", layer["duration"])
+            clip = clip.set_mask(matte_mask(layer["path"], key, trim, key_duration, layer["src_start"] - trim))
+
+        if layer.get("crop"):
+            x1, y1, x2, y2 = layer["crop"]
+            clip = crop(clip, x1=x1, y1=y1, x2=x2, y2=y2)
+
+    if "flash" in layer.get("effects", []):
+        clip = clip.fx(colorx, 3.0).fx(lum_contrast, 0, 20)
+
+    x, y, bw, bh = layer["box"]
+    box_size = (int(round(bw)), int(round(bh)))
+    if tuple(clip.size) != box_size:
+        clip = clip.resize(box_size)
+    return (
+        clip
+        .set_start(layer["start"])
+        .set_duration(dur)
+        .set_position((x, y))
     )
+
+
+def _moviepy_layer(layer, open_video, store=None):
+    if layer["kind"] == "video":
+        return _moviepy_video_layer(layer, open_video, store)
+
+    if layer["kind"] == "image":
+        x, y, bw, bh = layer["box"]
+        clip = ImageClip(layer["path"])
+        if layer.get("crop"):
+            x1, y1, x2, y2 = layer["crop"]
+            clip = crop(clip, x1=x1, y1=y1, x2=x2, y2=y2)
+        clip = clip.resize((int(round(bw)), int(round(bh))))
+        position = (x, y)
+    else:
+        rgba = rasterize_caption(layer["text"], layer["font"], layer["fontsize"], layer["color"], layer["width"])
+        mask = ImageClip(rgba[:, :, 3] / 255.0, ismask=True)
+        clip = ImageClip(rgba[:, :, :3]).set_mask(mask)
+        position = caption_position(layer, rgba.shape[1])
+
+    return clip.set_start(layer["start"]).set_duration(layer["duration"]).set_position(position)
+
+
+def _render_moviepy(plan, output_path, profile=DEFAULT_ENCODE_PROFILE):
+    w, h = plan["size"]
+    duration = plan["duration"]
+
+    # One reader per file per render (base layer + all of its zoom patches),
+    # all closed when the render ends or fails.
+    with MediaPool(os.path.basename(output_path)) as pool:
+        # Base clip + zoom patches read the same frames: decode them once.
+        shared = [layer for layer in plan["layers"] if _reads_store(layer, plan["source"])]
+        store = None
+        if shared:
+            rects = [layer.get("crop") or [0, 0, *layer["src_size"]] for layer in shared]
+            store = pool.own(FrameStore(plan["source"], plan["fps"], union_crop(rects)))
+        visual_layers = [_moviepy_layer(layer, pool.video, store) for layer in plan["layers"]]
+
+        final_video = pool.own(CompositeVideoClip(visual_layers, size=(w, h)).set_duration(duration))
+        if plan["audio"]:
+            # One premixed track instead of a reader per cue.
+            mixed = mix_cues(plan["audio"], duration)
+            final_video.audio = AudioArrayClip(mixed, fps=AUDIO_SAMPLE_RATE).set_duration(duration)
+
+        encode = ENCODE_PROFILES[profile]
+        extra = ["-crf", str(encode["crf"])] + (["-tune", encode["tune"]] if encode["tune"] else [])
+        final_video.write_videofile(
+            output_path,
+            fps=plan["fps"],
+            codec="libx264",
+            audio_codec="aac",
+            preset=encode["preset"],
+            threads=ENCODER_THREADS or encode["threads"],
+            ffmpeg_params=extra
+        )
+        if store:
+            print(f"[RENDER] {store.decoded} source frames decoded for {os.path.basename(output_path)}")
+
+
+def render_plan(plan, output_path, backend=None, profile=DEFAULT_ENCODE_PROFILE):
+    backend = backend or RENDER_BACKEND
+    if USE_ASSET_CACHE:
+        plan = prepare_layers(plan)
+    if backend == "ffmpeg":
+        from .ffmpeg_renderer import render_ffmpeg
+        render_ffmpeg(plan, output_path, x264_args(profile, ENCODER_THREADS))
+    elif backend == "moviepy":
+        _render_moviepy(plan, output_path, profile)
+    else:
+        raise ValueError(f"Unknown render backend: {backend}")
+
+
+def apply_chaos(video_path, ai_data, tts_files, output_path, backend=None, seed=None, force=False,
+                segmented=False, profile=None):
+    print("--- Editing: ADLIB + NO FLASH FIX + ROBUST GREEN SCREEN ---")
+    plan = plan_edit(video_path, ai_data, tts_files, seed=seed)
+    if not force and is_rendered(plan, output_path):
+        print(f"[EDIT] Plan unchanged, keeping {output_path}")
+        return plan
+
+    backend = backend or RENDER_BACKEND
+    profile = profile or choose_encode_profile()
+    started = time.perf_counter()
+    if segmented:
+        from .segment_renderer import render_segmented
+        render_segmented(plan, output_path, backend=backend, profile=profile)
+    else:
+        render_plan(plan, output_path, backend=backend, profile=profile)
+    elapsed = time.perf_counter() - started
+
+    record_render(plan, output_path)
+    size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+    save_render_log(output_path, profile, backend, segmented, plan["duration"], elapsed, size)
+    print(f"[EDIT] {profile}: {plan['duration']:.1f}s of video in {elapsed:.1f}s "
+          f"({plan['duration'] / max(elapsed, 1e-6):.2f}x), {(size or 0) / 1024 ** 2:.1f} MB")
+    return plan
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from .db_engine import count_pending_videos
+
+# Daily upload times the scheduler fires at.
+UPLOAD_SLOT_HOURS = (10, 14, 18)
+
+# x264 settings per profile. threads None = ffmpeg default (or the render
+# farm's per-worker share).
+ENCODE_PROFILES = {
+    "fast": {"preset": "veryfast", "crf": 23, "tune": None, "threads": None},
+    "balanced": {"preset": "medium", "crf": 20, "tune": "film", "threads": None},
+    "archival": {"preset": "slow", "crf": 18, "tune": "film", "threads": None},
+}
+DEFAULT_ENCODE_PROFILE = "balanced"
+
+# Queue empty and a slot this close: encode as fast as possible.
+FAST_WITHIN_HOURS = 2.0
+# This many videos already waiting (two days of slots): spend time on quality.
+ARCHIVAL_MIN_PENDING = 2 * len(UPLOAD_SLOT_HOURS)
+
+
+def hours_until_next_slot(now=None):
+    now = now or datetime.now()
+    for day in (0, 1):
+        base = (now + timedelta(days=day)).replace(minute=0, second=0, microsecond=0)
+        for hour in sorted(UPLOAD_SLOT_HOURS):
+            slot = base.replace(hour=hour)
+            if slot > now:
+                return (slot - now).total_seconds() / 3600
+    return 24.0
+
+
+def choose_encode_profile(now=None):
+    """
+    Pick a profile from the upload backlog: nothing PENDING and a slot
+    coming up -> fast; a deep backlog -> archival; otherwise balanced.
+    """
+    pending = count_pending_videos()
+    hours = hours_until_next_slot(now)
+    if pending == 0 and hours <= FAST_WITHIN_HOURS:
+        name = "fast"
+    elif pending >= ARCHIVAL_MIN_PENDING:
+        name = "archival"
+    else:
+        name = DEFAULT_ENCODE_PROFILE
+    print(f"[ENCODE] {name} profile ({pending} pending, next slot in {hours:.1f}h)")
+    return name
+
+
+def x264_args(name, threads=None):
+    """
+    ffmpeg output args for a profile; `threads` overrides the profile's.
+    """
+    profile = ENCODE_PROFILES[name]
+    args = ["-preset", profile["preset"], "-crf", str(profile["crf"])]
+    if profile["tune"]:
+        args += ["-tune", profile["tune"]]
+    threads = threads or profile["threads"]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
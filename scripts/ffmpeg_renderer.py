@@ -0,0 +1,186 @@
+import os
+import subprocess
+import tempfile
+
+import PIL.Image
+
+from .audio_engine import mix_cues, write_wav
+from .caption_engine import caption_position, rasterize_caption
+from .ffmpeg_tools import FFMPEG_BINARY
+
+# Max RGB distance (sqrt(3 * 255^2)); colorkey similarity is relative to it.
+_RGB_DISTANCE = 441.7
+
+# Same curve as colorx(3.0) followed by lum_contrast(0, 20) on 8-bit values.
+_FLASH_FILTER = "lutrgb=r='{e}':g='{e}':b='{e}'".format(e="clip(min(255,val*3)*21-2540,0,255)")
+
+
+def _t(seconds):
+    return f"{max(seconds, 0.0):.3f}"
+
+
+def _colorkey(key):
+    r, g, b = key["color"]
+    similarity = min(max(0.75 * key["thr"] / _RGB_DISTANCE, 0.01), 1.0)
+    blend = min(max(0.55 * key["thr"] / _RGB_DISTANCE, 0.0), 1.0)
+    return f"colorkey=0x{r:02x}{g:02x}{b:02x}:{similarity:.3f}:{blend:.3f}"
+
+
+class _Inputs:
+    """
+    ffmpeg -i arguments, one per distinct (path, mode) so the base clip and
+    all of its zoom patches decode from a single input. Non-looped videos
+    are input-seeked to `seeks[path]` so nothing before it is decoded.
+    """
+
+    def __init__(self, seeks=None):
+        self.args = []
+        self.seeks = seeks or {}
+        self._index = {}
+
+    def add(self, path, loop=False, still_for=None):
+        key = (path, loop, still_for)
+        if still_for is not None:
+            # Stills are looped per layer, never shared.
+            key += (len(self._index),)
+        if key not in self._index:
+            if still_for is not None:
+                self.args += ["-loop", "1", "-t", _t(still_for)]
+            elif loop:
+                self.args += ["-stream_loop", "-1"]
+            elif self.seeks.get(path):
+                self.args += ["-ss", _t(self.seeks[path])]
+            self.args += ["-i", path]
+            self._index[key] = len(self._index)
+        return self._index[key]
+
+
+def _video_chain(layer, label_in, label_out, seek=0.0):
+    filters = []
+    # The input already starts at `seek`.
+    start, dur = layer["src_start"] - seek, layer["duration"]
+    filters.append(f"trim=start={_t(start)}:duration={_t(dur)}")
+    filters.append("setpts=PTS-STARTPTS")
+    if layer.get("crop"):
+        x1, y1, x2, y2 = layer["crop"]
+        filters.append(f"crop={x2 - x1:.2f}:{y2 - y1:.2f}:{x1:.2f}:{y1:.2f}")
+    x, y, bw, bh = layer["box"]
+    filters.append(f"scale={int(round(bw))}:{int(round(bh))}")
+    if "flash" in layer.get("effects", []):
+        filters.append(_FLASH_FILTER)
+    filters.append("format=rgba")
+    if layer.get("chroma_key"):
+        filters.append(_colorkey(layer["chroma_key"]))
+    return f"[{label_in}]{','.join(filters)}[{label_out}]", (x, y)
+
+
+def _still_chain(label_in, label_out, size=None, crop=None):
+    filters = []
+    if crop:
+        x1, y1, x2, y2 = crop
+        filters.append(f"crop={x2 - x1:.2f}:{y2 - y1:.2f}:{x1:.2f}:{y1:.2f}")
+    if size:
+        filters.append(f"scale={int(round(size[0]))}:{int(round(size[1]))}")
+    filters.append("format=rgba")
+    return f"[{label_in}]{','.join(filters)}[{label_out}]"
+
+
+def build_command(plan, output_path, caption_dir, audio_path=None, encode_args=None):
+    """
+    Turn an edit plan into one ffmpeg invocation: every layer is trimmed,
+    cropped, scaled and keyed in a filter_complex and overlaid in z-order
+    on a black output-size canvas. Audio is the premixed track at
+    audio_path.
+    """
+    w, h = plan["size"]
+    duration = plan["duration"]
+    fps = plan["fps"]
+
+    # Seek each shared video to its earliest use (a render segment starts
+    # mid-clip) instead of trimming away everything before it.
+    seeks = {}
+    for layer in plan["layers"]:
+        if layer["kind"] == "video" and not layer.get("loop"):
+            seeks[layer["path"]] = min(seeks.get(layer["path"], layer["src_start"]), layer["src_start"])
+    inputs = _Inputs(seeks)
+    graph = [f"color=c=black:s={w}x{h}:r={fps}:d={_t(duration)},format=rgba[bg0]"]
+
+    # Split the shared decode of each video between the layers that use it.
+    uses = {}
+    for layer in plan["layers"]:
+        if layer["kind"] == "video":
+            idx = inputs.add(layer["path"], loop=layer.get("loop", False))
+            uses.setdefault(idx, []).append(layer)
+    taken = {}
+    for idx, layers in uses.items():
+        if len(layers) > 1:
+            outs = "".join(f"[v{idx}s{n}]" for n in range(len(layers)))
+            graph.append(f"[{idx}:v]split={len(layers)}{outs}")
+        taken[idx] = 0
+
+    def video_source(idx):
+        n = taken[idx]
+        taken[idx] += 1
+        return f"{idx}:v" if len(uses[idx]) == 1 else f"v{idx}s{n}"
+
+    canvas = "bg0"
+    for n, layer in enumerate(plan["layers"]):
+        label = f"l{n}"
+        if layer["kind"] == "video":
+            loop = layer.get("loop", False)
+            idx = inputs.add(layer["path"], loop=loop)
+            seek = 0.0 if loop else seeks[layer["path"]]
+            chain, (x, y) = _video_chain(layer, video_source(idx), label, seek)
+        elif layer["kind"] == "image":
+            idx = inputs.add(layer["path"], still_for=layer["duration"])
+            x, y, bw, bh = layer["box"]
+            chain = _still_chain(f"{idx}:v", label, (bw, bh), layer.get("crop"))
+        else:
+            rgba = rasterize_caption(layer["text"], layer["font"], layer["fontsize"], layer["color"], layer["width"])
+            png = os.path.join(caption_dir, f"caption_{n}.png")
+            PIL.Image.fromarray(rgba, "RGBA").save(png)
+            idx = inputs.add(png, still_for=layer["duration"])
+            x, y = caption_position(layer, rgba.shape[1])
+            chain = _still_chain(f"{idx}:v", label)
+
+        start, end = layer["start"], layer["start"] + layer["duration"]
+        graph.append(chain)
+        graph.append(f"[{label}]setpts=PTS-STARTPTS+{_t(start)}/TB[{label}t]")
+        graph.append(
+            f"[{canvas}][{label}t]overlay=x={int(round(x))}:y={int(round(y))}"
+            f":enable='between(t,{_t(start)},{_t(end)})':eof_action=pass[c{n}]"
+        )
+        canvas = f"c{n}"
+
+    graph.append(f"[{canvas}]fps={fps},format=yuv420p[vout]")
+
+    maps = ["-map", "[vout]"]
+    if audio_path:
+        audio_idx = inputs.add(audio_path)
+        maps += ["-map", f"{audio_idx}:a"]
+
+    return (
+        [FFMPEG_BINARY, "-y", "-v", "error", "-nostdin"]
+        + inputs.args
+        + ["-filter_complex", ";".join(graph)]
+        + maps
+        + list(encode_args or [])
+        + ["-t", _t(duration), "-r", str(fps), "-c:v", "libx264", "-c:a", "aac", output_path]
+    )
+
+
+def render_ffmpeg(plan, output_path, encode_args=None):
+    """
+    Render an edit plan in a single ffmpeg process instead of compositing
+    frames in Python.
+    """
+    with tempfile.TemporaryDirectory(prefix="render_") as caption_dir:
+        audio_path = None
+        if plan["audio"]:
+            audio_path = os.path.join(caption_dir, "mix.wav")
+            write_wav(mix_cues(plan["audio"], plan["duration"]), audio_path)
+        cmd = build_command(plan, output_path, caption_dir, audio_path, encode_args)
+        print(f"[FFMPEG] Rendering {len(plan['layers'])} layers, {len(plan['audio'])} audio cues -> {output_path}")
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg render failed for {output_path}: {proc.stderr.decode(errors='ignore')[-500:]}")
@@ -0,0 +1,109 @@
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+FFMPEG_BINARY = get_setting("FFMPEG_BINARY")
+
+
+def _frames_cmd(path, width, height, fps, pix_fmt, start, duration, vf):
+    cmd = [FFMPEG_BINARY, "-v", "error", "-nostdin"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", path]
+    if duration:
+        cmd += ["-t", f"{duration:.3f}"]
+
+    filters = []
+    if vf:
+        filters.append(vf)
+    if fps:
+        filters.append(f"fps={fps}")
+    filters.append(f"scale={width}:{height}")
+    return cmd + ["-an", "-vf", ",".join(filters), "-f", "rawvideo", "-pix_fmt", pix_fmt, "-"]
+
+
+def _frame_shape(count, width, height, channels):
+    return (count, height, width) if channels == 1 else (count, height, width, channels)
+
+
+def read_frames(path, width, height, fps=None, pix_fmt="gray", start=None, duration=None, vf=None):
+    """
+    Decode a video straight into a uint8 array of shape (N, height, width)
+    for gray or (N, height, width, 3) for rgb24, scaled by ffmpeg.
+    """
+    channels = {"gray": 1, "rgb24": 3}[pix_fmt]
+    cmd = _frames_cmd(path, width, height, fps, pix_fmt, start, duration, vf)
+
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed for {path}: {proc.stderr.decode(errors='ignore')[-300:]}")
+
+    frame_size = width * height * channels
+    data = np.frombuffer(proc.stdout, dtype=np.uint8)
+    count = len(data) // frame_size
+    return data[:count * frame_size].reshape(_frame_shape(count, width, height, channels))
+
+
+def iter_frames(path, width, height, chunk_frames, fps=None, pix_fmt="gray", start=None, duration=None, vf=None):
+    """
+    Like read_frames, but streamed from the ffmpeg pipe as arrays of up to
+    `chunk_frames` frames, so only one chunk is in memory at a time.
+    """
+    channels = {"gray": 1, "rgb24": 3}[pix_fmt]
+    cmd = _frames_cmd(path, width, height, fps, pix_fmt, start, duration, vf)
+    frame_size = width * height * channels
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            raw = proc.stdout.read(frame_size * chunk_frames)
+            count = len(raw) // frame_size
+            if count:
+                data = np.frombuffer(raw[:count * frame_size], dtype=np.uint8)
+                yield data.reshape(_frame_shape(count, width, height, channels))
+            if len(raw) < frame_size * chunk_frames:
+                break
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg decode failed for {path}: {stderr.decode(errors='ignore')[-300:]}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def read_audio(path, sample_rate=16000, channels=1, start=None, duration=None):
+    """
+    Decode an audio track into float32 samples in [-1, 1], shape (N, channels).
+    Returns an empty array for files without audio.
+    """
+    cmd = [FFMPEG_BINARY, "-v", "error", "-nostdin"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", path]
+    if duration:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += ["-vn", "-ac", str(channels), "-ar", str(sample_rate), "-f", "f32le", "-"]
+
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    data = np.frombuffer(proc.stdout, dtype=np.float32)
+    count = len(data) // channels
+    return data[:count * channels].reshape(count, channels)
+
+
+def probe_media(path):
+    """
+    Duration, size, fps and audio presence from ffmpeg's stream info,
+    without opening a MoviePy reader.
+    """
+    infos = ffmpeg_parse_infos(path)
+    return {
+        "duration": infos.get("duration") or 0.0,
+        "size": tuple(infos["video_size"]) if infos.get("video_found") else None,
+        "fps": infos.get("video_fps") if infos.get("video_found") else None,
+        "has_audio": bool(infos.get("audio_found")),
+    }
@@ -0,0 +1,251 @@
+import threading
+
+import numpy as np
+
+from .db_engine import add_clip_fingerprint, get_clip_fingerprints
+from .ffmpeg_tools import read_audio, read_frames
+
+# Hash steps per second of clip; matching works on these time-aligned steps.
+FINGERPRINT_DECODE_FPS = 2
+# Center crop hashed, relative to frame height: a square of ih/2 is the same
+# picture in a 16:9 clip and in its 9:16 center-cropped repost.
+FINGERPRINT_CROP = "crop='min(iw,ih/2)':'ih/2'"
+# Max differing bits (out of 64) for two step hashes to count as the same frame.
+FINGERPRINT_STEP_DISTANCE = 10
+# Near-uniform frames (black, fades) hash to almost all 0s or 1s; skip them.
+FINGERPRINT_MIN_DETAIL_BITS = 8
+# A match needs this many aligned steps (3 s at 2 fps)...
+FINGERPRINT_MIN_MATCH_STEPS = 6
+# ...covering this share of the two clips' overlap at that alignment...
+FINGERPRINT_MIN_MATCH_RATIO = 0.5
+# ...and audio loudness moving the same way over this share of it.
+FINGERPRINT_MIN_AUDIO_AGREEMENT = 0.6
+
+
+def _frame_hashes(path):
+    # 9x8 grayscale proxies of the center crop; a dHash compares horizontally
+    # adjacent pixels.
+    frames = read_frames(path, 9, 8, fps=FINGERPRINT_DECODE_FPS, pix_fmt="gray", vf=FINGERPRINT_CROP).astype(np.int16)
+    bits = frames[:, :, 1:] > frames[:, :, :-1]
+    return [_bits_to_int(b) for b in bits]
+
+
+def _audio_rises(path, steps):
+    # One bit per step: louder than the step before. Survives re-encodes
+    # and volume changes, and lines up with the frame steps.
+    rate = 8000
+    samples = read_audio(path, sample_rate=rate, channels=1)[:, 0]
+    window = rate // FINGERPRINT_DECODE_FPS
+    count = min(steps, len(samples) // window)
+    if count < 2:
+        return []
+    rms = np.sqrt(np.mean(samples[:count * window].reshape(count, window) ** 2, axis=1))
+    return [False] + [bool(r) for r in rms[1:] > rms[:-1]]
+
+
+def _bits_to_int(bits):
+    value = 0
+    for b in np.asarray(bits, dtype=np.uint8).ravel():
+        value = (value << 1) | int(b)
+    return value
+
+
+def compute_fingerprint(path):
+    """
+    Perceptual fingerprint of a clip: a 64-bit dHash of the frame center
+    crop and a loudness-rise bit per 1/FINGERPRINT_DECODE_FPS step, as
+    {"frames": [int, ...], "audio": [bool, ...]}. Clips are matched on
+    their best time alignment, so trims, re-encodes, rescaling and vertical
+    center-crop reposts of the same moment still match.
+    """
+    frames = _frame_hashes(path)
+    if not frames:
+        return None
+    return {"frames": frames, "audio": _audio_rises(path, len(frames))}
+
+
+def encode_fingerprint(fingerprint):
+    """
+    DB form: 16 hex digits per frame step, "/", one 0/1 per audio step.
+    """
+    frames = "".join(format(h, "016x") for h in fingerprint["frames"])
+    audio = "".join("1" if bit else "0" for bit in fingerprint["audio"])
+    return f"{frames}/{audio}"
+
+
+def decode_fingerprint(text):
+    """
+    Inverse of encode_fingerprint; None for rows in an older format.
+    """
+    if not text or "/" not in text:
+        return None
+    frames, audio = text.split("/", 1)
+    return {
+        "frames": [int(frames[i:i + 16], 16) for i in range(0, len(frames), 16)],
+        "audio": [c == "1" for c in audio],
+    }
+
+
+def _has_detail(step_hash):
+    bits = bin(step_hash).count("1")
+    return FINGERPRINT_MIN_DETAIL_BITS <= bits <= 64 - FINGERPRINT_MIN_DETAIL_BITS
+
+
+def _audio_agreement(a, b, offset):
+    # Share of overlapping steps where both clips got louder or quieter
+    # together (a's step i is b's step i + offset); None without audio.
+    pairs = [(a[i], b[i + offset]) for i in range(1, len(a)) if 1 <= i + offset < len(b)]
+    if len(pairs) < FINGERPRINT_MIN_MATCH_STEPS:
+        return None
+    return sum(x == y for x, y in pairs) / len(pairs)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance. Lookups only visit children
+    whose edge distance is within max_distance of the query's distance.
+    """
+
+    def __init__(self, distance=hamming):
+        self.distance = distance
+        self.root = None
+        self.size = 0
+
+    def add(self, key, value):
+        self.size += 1
+        if self.root is None:
+            self.root = (key, value, {})
+            return
+        node = self.root
+        while True:
+            d = self.distance(key, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, value, {})
+                return
+            node = child
+
+    def search(self, key, max_distance):
+        """
+        Returns [(distance, value), ...] sorted by distance.
+        """
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_key, value, children = stack.pop()
+            d = self.distance(key, node_key)
+            if d <= max_distance:
+                found.append((d, value))
+            for edge, child in children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class FingerprintIndex:
+    """
+    In-memory BK-tree of per-step frame hashes of clip fingerprints. A query
+    looks up each of its steps and votes for (clip, time offset); the best
+    supported alignment is then checked against the overlap and the audio.
+    The shared index is loaded from the DB on first use (load=False gives an
+    empty per-batch index). Safe to share between pipeline threads.
+    """
+
+    def __init__(self, load=True):
+        self.tree = BKTree()
+        self.clips = {}
+        self._lock = threading.Lock()
+        self._loaded = not load
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        for platform, clip_id, text in get_clip_fingerprints():
+            fingerprint = decode_fingerprint(text)
+            if fingerprint:
+                self._add(fingerprint, (platform, clip_id))
+        self._loaded = True
+
+    def _add(self, fingerprint, key):
+        self.clips[key] = fingerprint
+        for step, step_hash in enumerate(fingerprint["frames"]):
+            if _has_detail(step_hash):
+                self.tree.add(step_hash, (key, step))
+
+    def _search(self, fingerprint):
+        votes = {}
+        for step, step_hash in enumerate(fingerprint["frames"]):
+            if not _has_detail(step_hash):
+                continue
+            for _, (key, other_step) in self.tree.search(step_hash, FINGERPRINT_STEP_DISTANCE):
+                offset = other_step - step
+                votes[(key, offset)] = votes.get((key, offset), 0) + 1
+
+        best = None
+        for (key, offset), count in votes.items():
+            # Sampling phase can differ by half a step; count the neighbours.
+            count += votes.get((key, offset - 1), 0) + votes.get((key, offset + 1), 0)
+            if count < FINGERPRINT_MIN_MATCH_STEPS:
+                continue
+            other = self.clips[key]
+            overlap = min(len(fingerprint["frames"]), len(other["frames"]) - offset) - max(0, -offset)
+            ratio = min(count / max(overlap, 1), 1.0)
+            if ratio < FINGERPRINT_MIN_MATCH_RATIO:
+                continue
+            agreement = _audio_agreement(fingerprint["audio"], other["audio"], offset)
+            if agreement is not None and agreement < FINGERPRINT_MIN_AUDIO_AGREEMENT:
+                continue
+            if best is None or ratio > best[0]:
+                best = (ratio, key)
+        return best
+
+    def find_duplicate(self, fingerprint):
+        """
+        Returns (share of the aligned overlap that matched, (platform, clip_id))
+        of the best-matching stored clip, or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._search(fingerprint)
+
+    def add(self, fingerprint, platform, clip_id):
+        with self._lock:
+            self._ensure_loaded()
+            self._add(fingerprint, (platform, clip_id))
+
+    def check_and_add(self, fingerprint, platform, clip_id):
+        """
+        Atomically look for a near-duplicate and, if none, index this clip so
+        later clips in the same batch are compared against it. Meant for a
+        per-batch index; shipped clips go into the shared one via add().
+        """
+        with self._lock:
+            self._ensure_loaded()
+            match = self._search(fingerprint)
+            if match:
+                return match
+            self._add(fingerprint, (platform, clip_id))
+            return None
+
+
+def persist_fingerprint(fingerprint, platform, clip_id, creator_id=None):
+    add_clip_fingerprint(platform, clip_id, creator_id, encode_fingerprint(fingerprint))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_fingerprint_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex()
+        return _index
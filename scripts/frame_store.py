@@ -0,0 +1,114 @@
+import math
+import subprocess
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .ffmpeg_tools import FFMPEG_BINARY
+
+# Decoded frames kept around; base and zoom patches ask for the same index.
+FRAME_STORE_CACHE_FRAMES = 48
+# Read forward through a gap this big instead of restarting ffmpeg.
+FRAME_STORE_MAX_SKIP = 96
+
+
+def union_crop(rects):
+    """
+    Smallest integer rect covering every (x1, y1, x2, y2) in rects.
+    """
+    x1 = min(r[0] for r in rects)
+    y1 = min(r[1] for r in rects)
+    x2 = max(r[2] for r in rects)
+    y2 = max(r[3] for r in rects)
+    return [int(math.floor(x1)), int(math.floor(y1)), int(math.ceil(x2)), int(math.ceil(y2))]
+
+
+class FrameStore:
+    """
+    One streaming ffmpeg decode of a clip (cropped to `crop`, at `fps`)
+    behind a small LRU of frames. Every layer cut from the same clip reads
+    through it, so each source frame is decoded once per render; a request
+    behind the cache or far ahead restarts the decoder at that time.
+    """
+
+    def __init__(self, path, fps, crop, cache_frames=FRAME_STORE_CACHE_FRAMES):
+        self.path = path
+        self.fps = fps
+        self.crop = crop
+        self.width = crop[2] - crop[0]
+        self.height = crop[3] - crop[1]
+        self.cache_frames = cache_frames
+        self.decoded = 0
+        self._frames = OrderedDict()
+        self._proc = None
+        self._next = 0
+        self._last = None
+        self._end = None
+        self._lock = threading.Lock()
+
+    def _start(self, index):
+        self._stop()
+        x1, y1 = self.crop[0], self.crop[1]
+        cmd = [FFMPEG_BINARY, "-v", "error", "-nostdin"]
+        if index:
+            cmd += ["-ss", f"{index / self.fps:.3f}"]
+        cmd += [
+            "-i", self.path, "-an",
+            "-vf", f"crop={self.width}:{self.height}:{x1}:{y1},fps={self.fps}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+        ]
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._next = index
+
+    def _stop(self):
+        if self._proc:
+            self._proc.kill()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+
+    def _read_one(self):
+        size = self.width * self.height * 3
+        raw = self._proc.stdout.read(size) if self._proc else b""
+        if len(raw) < size:
+            self._stop()
+            return None
+        frame = np.frombuffer(raw, dtype=np.uint8).reshape(self.height, self.width, 3)
+        self.decoded += 1
+        self._frames[self._next] = frame
+        self._last = frame
+        self._next += 1
+        while len(self._frames) > self.cache_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def frame(self, t):
+        """
+        RGB frame at time t (seconds), cropped; past the end, the last frame.
+        """
+        index = max(int(t * self.fps + 1e-6), 0)
+        with self._lock:
+            if index in self._frames:
+                self._frames.move_to_end(index)
+                return self._frames[index]
+            if self._end is not None and index >= self._end and self._last is not None:
+                return self._last
+            if self._proc is None or index < self._next or index > self._next + FRAME_STORE_MAX_SKIP:
+                self._start(index)
+            frame = None
+            while self._next <= index:
+                frame = self._read_one()
+                if frame is None:
+                    self._end = self._next
+                    break
+            if frame is None:
+                frame = self._frames.get(index, self._last)
+            if frame is None:
+                return np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            return frame
+
+    def close(self):
+        with self._lock:
+            self._stop()
+            self._frames.clear()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from .config import TEMP_DIR
+from .ffmpeg_tools import iter_frames, probe_media
+
+MATTE_DIR = os.path.join(TEMP_DIR, "mattes")
+# Frames decoded and keyed per pass; bounds the rgb24 and float32 working set.
+MATTE_CHUNK_FRAMES = 16
+
+_hash_cache = {}
+_lock = threading.Lock()
+
+
+def file_hash(path):
+    """
+    SHA-1 of the file contents, memoised per (path, size, mtime).
+    """
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime)
+    with _lock:
+        if memo_key in _hash_cache:
+            return _hash_cache[memo_key]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    value = digest.hexdigest()
+    with _lock:
+        _hash_cache[memo_key] = value
+    return value
+
+
+def key_alpha(frames, color, thr, s):
+    """
+    Vectorised MoviePy mask_color over a (N, H, W, 3) uint8 stack: alpha is
+    d^s / (thr^s + d^s) of each pixel's RGB distance d to the key color
+    (opaque away from green), returned as clamped uint8.
+    """
+    diff = frames.astype(np.float32) - np.asarray(color, dtype=np.float32)
+    dist = np.sqrt(np.einsum("nhwc,nhwc->nhw", diff, diff))
+    if thr:
+        ds = dist ** s
+        alpha = ds / (float(thr) ** s + ds)
+    else:
+        alpha = (dist != 0).astype(np.float32)
+    return np.round(np.clip(alpha, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def _matte_name(path, key, trim, duration):
+    params = json.dumps(
+        {"color": list(key["color"]), "thr": key["thr"], "s": key["s"], "trim": round(trim, 3), "duration": round(duration, 3)},
+        sort_keys=True,
+    )
+    digest = hashlib.sha1(f"{file_hash(path)}:{params}".encode("utf-8")).hexdigest()
+    return digest[:24]
+
+
+def get_matte(path, key, trim=0.0, duration=None):
+    """
+    Alpha matte for a green-screen asset from `trim` for `duration` seconds,
+    as a read-only memmap of shape (N, H, W) uint8 plus its fps. Keyed once
+    per (file hash, key params, trim, duration) and stored as .npy.
+    """
+    info = probe_media(path)
+    fps = info["fps"] or 24.0
+    if duration is None:
+        duration = max(info["duration"] - trim, 0.0)
+
+    os.makedirs(MATTE_DIR, exist_ok=True)
+    name = _matte_name(path, key, trim, duration)
+    npy_path = os.path.join(MATTE_DIR, f"{name}.npy")
+
+    if not os.path.exists(npy_path):
+        width, height = info["size"]
+        tmp = os.path.join(MATTE_DIR, f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # Frame count is only known once ffmpeg is done: spill alphas to a
+        # raw file chunk by chunk, then copy them into an exact-size .npy.
+        count = 0
+        try:
+            with open(f"{tmp}.raw", "wb") as raw:
+                chunks = iter_frames(path, width, height, MATTE_CHUNK_FRAMES, fps=fps, pix_fmt="rgb24", start=trim, duration=duration)
+                for frames in chunks:
+                    raw.write(key_alpha(frames, key["color"], key["thr"], key["s"]).tobytes())
+                    count += len(frames)
+            if not count:
+                raise RuntimeError(f"No frames decoded from {path} at {trim:.3f}s")
+            alphas = np.memmap(f"{tmp}.raw", dtype=np.uint8, mode="r", shape=(count, height, width))
+            matte = np.lib.format.open_memmap(f"{tmp}.npy", mode="w+", dtype=np.uint8, shape=(count, height, width))
+            for i in range(0, count, MATTE_CHUNK_FRAMES):
+                matte[i:i + MATTE_CHUNK_FRAMES] = alphas[i:i + MATTE_CHUNK_FRAMES]
+            matte.flush()
+            del matte, alphas
+            os.replace(f"{tmp}.npy", npy_path)
+        finally:
+            for leftover in (f"{tmp}.raw", f"{tmp}.npy"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        print(f"[MATTE] Keyed {os.path.basename(path)}: {count} frames -> {npy_path}")
+
+    return np.load(npy_path, mmap_mode="r"), fps
@@ -0,0 +1,96 @@
+import gc
+import os
+import threading
+
+from moviepy.editor import VideoFileClip
+
+_live = 0
+_live_lock = threading.Lock()
+
+
+def _track(delta):
+    global _live
+    with _live_lock:
+        _live += delta
+        return _live
+
+
+def rss_mb():
+    """
+    Resident set size of this process in MB (from /proc, else peak RSS).
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def media_stats():
+    with _live_lock:
+        live = _live
+    return {"live_readers": live, "rss_mb": round(rss_mb(), 1)}
+
+
+class MediaPool:
+    """
+    Scoped owner of the ffmpeg readers one render needs. Readers open on
+    first use, are shared per file, and are all closed when the `with`
+    block exits, whether the render finished or raised.
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self._videos = {}
+        self._extra = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def video(self, path):
+        with self._lock:
+            clip = self._videos.get(path)
+            if clip is None:
+                clip = VideoFileClip(path, audio=False)
+                self._videos[path] = clip
+                _track(1)
+            return clip
+
+    def own(self, clip):
+        """
+        Close `clip` with the pool too (composites, audio arrays, ...).
+        """
+        with self._lock:
+            self._extra.append(clip)
+        return clip
+
+    def close(self):
+        with self._lock:
+            videos, self._videos = list(self._videos.values()), {}
+            extra, self._extra = self._extra, []
+
+        for clip in extra + videos:
+            try:
+                clip.close()
+            except Exception as e:
+                print(f"[MEDIA] Failed to close {clip}: {e}")
+        _track(-len(videos))
+        # Frame buffers hang off reference cycles inside MoviePy clips.
+        gc.collect()
+
+        stats = media_stats()
+        print(
+            f"[MEDIA] {self.label or 'render'}: closed {len(videos)} readers | "
+            f"live={stats['live_readers']} rss={stats['rss_mb']}MB"
+        )
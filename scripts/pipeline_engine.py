@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+# Items allowed to wait between two stages before upstream workers block.
+PIPELINE_QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+def run_pipeline(items, stages, queue_size=PIPELINE_QUEUE_SIZE, on_error=None):
+    """
+    Push items through a chain of stages connected by bounded queues.
+
+    stages is a list of (name, fn, workers). Each fn takes the item from
+    the previous stage and returns the item for the next one, or None to
+    drop it. Every stage runs on its own worker threads, so stage N can
+    work on one item while stage N-1 works on the next; throughput is set
+    by the slowest stage rather than the sum of all of them.
+
+    on_error(stage_name, item, exc) is called when a stage raises; the
+    item is then dropped. Returns (outputs of the last stage, stats).
+    """
+    stages = [(name, fn, max(1, workers)) for name, fn, workers in stages]
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+    results = []
+    results_lock = threading.Lock()
+    stats = {
+        name: {"workers": workers, "processed": 0, "dropped": 0, "errors": 0, "busy_seconds": 0.0}
+        for name, _, workers in stages
+    }
+    remaining = [workers for _, _, workers in stages]
+    remaining_lock = threading.Lock()
+
+    def feed():
+        for item in items:
+            queues[0].put(item)
+        for _ in range(stages[0][2]):
+            queues[0].put(_DONE)
+
+    def work(index):
+        name, fn, _ = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        st = stats[name]
+        try:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                started = time.monotonic()
+                try:
+                    out = fn(item)
+                except Exception as e:
+                    out = None
+                    print(f"   [PIPELINE] {name} failed: {e}")
+                    with results_lock:
+                        st["errors"] += 1
+                    if on_error:
+                        try:
+                            on_error(name, item, e)
+                        except Exception as cleanup_error:
+                            print(f"   [PIPELINE] {name} error handler failed: {cleanup_error}")
+                elapsed = time.monotonic() - started
+                with results_lock:
+                    st["busy_seconds"] += elapsed
+                    st["processed"] += 1
+                    if out is None:
+                        st["dropped"] += 1
+                if out is None:
+                    continue
+                if outbox is not None:
+                    outbox.put(out)
+                else:
+                    with results_lock:
+                        results.append(out)
+        finally:
+            # Last worker out closes the next stage, even if this one died.
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and outbox is not None:
+                for _ in range(stages[index + 1][2]):
+                    outbox.put(_DONE)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for i, (name, _, workers) in enumerate(stages):
+        for w in range(workers):
+            threads.append(threading.Thread(target=work, args=(i,), name=f"{name}-{w}", daemon=True))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    wall = time.monotonic() - started
+    print(f"   [PIPELINE] Finished in {wall:.1f}s wall")
+    for name, st in stats.items():
+        print(
+            f"   [PIPELINE] {name}: {st['processed']} in, {st['dropped']} dropped, "
+            f"{st['errors']} errors, {st['busy_seconds']:.1f}s busy on {st['workers']} workers"
+        )
+    return results, stats
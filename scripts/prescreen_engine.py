@@ -0,0 +1,95 @@
+import numpy as np
+
+from .db_engine import save_clip_screening
+from .ffmpeg_tools import read_audio, read_frames
+
+# Proxy the screen decodes: tiny gray frames and 8 kHz mono audio.
+PRESCREEN_SIZE = (64, 36)
+PRESCREEN_FPS = 4
+PRESCREEN_SAMPLE_RATE = 8000
+# Loudness windows (seconds) for RMS / peak detection.
+PRESCREEN_WINDOW_SECONDS = 0.05
+
+# Mean absolute frame difference (0-1) below which a clip looks static.
+PRESCREEN_MIN_MOTION = 0.015
+# Share of audio windows louder than PRESCREEN_ACTIVE_DB.
+PRESCREEN_MIN_ACTIVE_AUDIO = 0.25
+PRESCREEN_ACTIVE_DB = -35.0
+# Loud transients (shouts, hits) per second.
+PRESCREEN_MIN_PEAKS_PER_SECOND = 0.2
+
+
+def _motion_energy(path):
+    width, height = PRESCREEN_SIZE
+    frames = read_frames(path, width, height, fps=PRESCREEN_FPS, pix_fmt="gray")
+    if len(frames) < 2:
+        return 0.0
+    diffs = np.abs(np.diff(frames.astype(np.int16), axis=0)).mean(axis=(1, 2)) / 255.0
+    return float(diffs.mean())
+
+
+def _audio_stats(path):
+    samples = read_audio(path, sample_rate=PRESCREEN_SAMPLE_RATE, channels=1)[:, 0]
+    window = int(PRESCREEN_SAMPLE_RATE * PRESCREEN_WINDOW_SECONDS)
+    count = len(samples) // window
+    if count == 0:
+        return {"rms_db": -120.0, "active_ratio": 0.0, "peak_density": 0.0}
+
+    rms = np.sqrt(np.mean(samples[:count * window].reshape(count, window) ** 2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-6))
+    # A peak is a window well above the clip's typical loudness that starts a burst.
+    loud = (db > PRESCREEN_ACTIVE_DB + 10) & (db > np.median(db) + 6)
+    onsets = np.count_nonzero(loud[1:] & ~loud[:-1]) + int(loud[0])
+    seconds = count * PRESCREEN_WINDOW_SECONDS
+
+    return {
+        "rms_db": float(20 * np.log10(max(float(np.sqrt(np.mean(rms ** 2))), 1e-6))),
+        "active_ratio": float(np.mean(db > PRESCREEN_ACTIVE_DB)),
+        "peak_density": float(onsets / seconds),
+    }
+
+
+def screen_clip(path):
+    """
+    Score a clip from a downsampled proxy before any paid stage runs.
+    Returns motion, rms_db, active_ratio, peak_density, a 0-1+ score and a
+    verdict: "pass", "weak" (static OR quiet: produce only if short) or
+    "reject" (static AND quiet, e.g. a BRB screen).
+    """
+    motion = _motion_energy(path)
+    audio = _audio_stats(path)
+
+    dull_video = motion < PRESCREEN_MIN_MOTION
+    dull_audio = (
+        audio["active_ratio"] < PRESCREEN_MIN_ACTIVE_AUDIO
+        and audio["peak_density"] < PRESCREEN_MIN_PEAKS_PER_SECOND
+    )
+    if dull_video and dull_audio:
+        verdict = "reject"
+    elif dull_video or dull_audio:
+        verdict = "weak"
+    else:
+        verdict = "pass"
+
+    score = np.mean([
+        min(motion / PRESCREEN_MIN_MOTION, 3.0),
+        min(audio["active_ratio"] / PRESCREEN_MIN_ACTIVE_AUDIO, 3.0),
+        min(audio["peak_density"] / PRESCREEN_MIN_PEAKS_PER_SECOND, 3.0),
+    ]) / 3.0
+
+    return dict(audio, motion=motion, score=float(score), verdict=verdict)
+
+
+def screen_and_record(path, candidate):
+    """
+    screen_clip + store the scores in clip_screening so thresholds can be
+    tuned against views later.
+    """
+    result = screen_clip(path)
+    save_clip_screening(candidate, path, result)
+    print(
+        f"   [SCREEN] {result['verdict'].upper()} {candidate.get('clip_url')} | "
+        f"motion={result['motion']:.3f} active={result['active_ratio']:.2f} "
+        f"peaks/s={result['peak_density']:.2f} rms={result['rms_db']:.1f}dB"
+    )
+    return result
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Weights for the z-scored features. Positive = better.
+RANKING_WEIGHTS = {
+    "views": 1.0,         # log view_count
+    "velocity": 1.5,      # log views per hour since the clip was made
+    "momentum": 0.75,     # log live viewer_count of the creator
+    "engagement": 0.75,   # log live viewers per follower
+    "duration": 0.5,      # closeness to the ideal Shorts length
+}
+
+# Clip length the edit works best with, and how quickly the score falls off.
+IDEAL_DURATION_SECONDS = 30.0
+DURATION_SIGMA_SECONDS = 15.0
+# Clips shorter than this leave no room for the roast lines.
+MIN_DURATION_SECONDS = 5.0
+
+
+def _age_hours(created_at, now):
+    if not created_at:
+        return np.nan
+    try:
+        ts = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except ValueError:
+        return np.nan
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return max((now - ts).total_seconds() / 3600.0, 0.0)
+
+
+def _zscore(values):
+    values = np.where(np.isfinite(values), values, np.nan)
+    if np.all(np.isnan(values)):
+        return np.zeros_like(values)
+    mean = np.nanmean(values)
+    std = np.nanstd(values)
+    z = (values - mean) / std if std > 0 else values - mean
+    # Missing fields score as average rather than best/worst.
+    return np.nan_to_num(z, nan=0.0)
+
+
+def score_candidates(candidates, weights=None, now=None):
+    """
+    Score every candidate at once from fields the Helix / YouTube responses
+    already carry: view_count, viewer_count, follower_total, created_at and
+    duration. Returns a float array aligned with candidates; hard rejects
+    (zero views, too short) get -inf.
+    """
+    if not candidates:
+        return np.zeros(0)
+    weights = dict(RANKING_WEIGHTS, **(weights or {}))
+    now = now or datetime.now(timezone.utc)
+
+    def column(key):
+        return np.array([float(c.get(key) or 0) for c in candidates], dtype=np.float64)
+
+    views = column("view_count")
+    viewers = column("viewer_count")
+    followers = column("follower_total")
+    duration = np.array(
+        [float(c["duration"]) if c.get("duration") else np.nan for c in candidates],
+        dtype=np.float64,
+    )
+    age = np.array([_age_hours(c.get("created_at"), now) for c in candidates], dtype=np.float64)
+
+    features = {
+        "views": np.log1p(views),
+        "velocity": np.log1p(views / np.maximum(age, 0.5)),
+        "momentum": np.log1p(viewers),
+        "engagement": np.log1p(100.0 * viewers / np.maximum(followers, 1.0)),
+        "duration": np.exp(-0.5 * ((duration - IDEAL_DURATION_SECONDS) / DURATION_SIGMA_SECONDS) ** 2),
+    }
+
+    scores = np.zeros(len(candidates))
+    for name, values in features.items():
+        scores += weights.get(name, 0.0) * _zscore(values)
+
+    rejected = (views <= 0) | (duration < MIN_DURATION_SECONDS)
+    scores[rejected] = -np.inf
+    return scores
+
+
+def rank_candidates(candidates, top_k=None, weights=None, unique_creators=True):
+    """
+    Sort candidates best-first (each gets a "score" key) and keep the top_k,
+    at most one clip per creator. Hard rejects are dropped.
+    """
+    scores = score_candidates(candidates, weights=weights)
+    order = np.argsort(-scores, kind="stable")
+
+    ranked = []
+    used = set()
+    for idx in order:
+        if not np.isfinite(scores[idx]):
+            break
+        c = candidates[idx]
+        key = (c.get("platform"), c.get("creator_id"))
+        if unique_creators and key in used:
+            continue
+        c["score"] = float(scores[idx])
+        ranked.append(c)
+        used.add(key)
+        if top_k is not None and len(ranked) >= top_k:
+            break
+    return ranked
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Peak RSS of one MoviePy render of a ~60 s 1080x1920 short.
+RENDER_MEMORY_PER_WORKER_MB = 1500
+# Share of available memory the farm may plan to use.
+RENDER_MEMORY_FRACTION = 0.7
+# Hard cap on render processes (None = cores/memory decide).
+RENDER_MAX_WORKERS = None
+
+
+def _available_memory_mb():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def farm_size(max_workers=RENDER_MAX_WORKERS):
+    """
+    (workers, encoder threads per worker): one render process per core as
+    far as the memory budget allows, with the cores split evenly between
+    their x264 encoders.
+    """
+    cores = os.cpu_count() or 1
+    workers = cores
+    memory = _available_memory_mb()
+    if memory:
+        workers = min(workers, int(memory * RENDER_MEMORY_FRACTION // RENDER_MEMORY_PER_WORKER_MB))
+    if max_workers:
+        workers = min(workers, max_workers)
+    workers = max(1, workers)
+    return workers, max(1, cores // workers)
+
+
+def init_render_worker(threads):
+    from . import editor_engine
+    editor_engine.ENCODER_THREADS = threads
+
+
+def _render_job(raw_path, ai_data, tts_files, output_path):
+    from .editor_engine import apply_chaos
+    apply_chaos(raw_path, ai_data, tts_files, output_path)
+    return output_path if os.path.exists(output_path) else None
+
+
+class RenderFarm:
+    """
+    Pool of render processes. MoviePy compositing is mostly single-threaded
+    Python, so renders run in separate processes; the caller queues each
+    finished render for upload, so a failed queue write surfaces there.
+    """
+
+    def __init__(self, max_workers=RENDER_MAX_WORKERS):
+        self.workers, self.threads = farm_size(max_workers)
+        # Spawn: the parent runs pipeline threads, which fork() does not mix with.
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_render_worker,
+            initargs=(self.threads,),
+        )
+        print(f"[FARM] {self.workers} render workers x {self.threads} encoder threads")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+    def submit(self, raw_path, ai_data, tts_files, output_path):
+        """
+        Start a render; the returned future resolves to output_path or None.
+        """
+        return self._pool.submit(_render_job, raw_path, ai_data, tts_files, output_path)
+
+    def render(self, raw_path, ai_data, tts_files, output_path):
+        return self.submit(raw_path, ai_data, tts_files, output_path).result()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
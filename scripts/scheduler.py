@@ -2,6 +2,7 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from .db_engine import get_next_video
 from .uploader_engine import upload_video, QuotaExceededError
 from .discovery_engine import discover_and_queue
+from .encode_profiles import UPLOAD_SLOT_HOURS
 from datetime import datetime, timedelta
 import time
 
@@ -42,12 +43,9 @@ def job_discover_next_day():
         print(f"   [ERROR] Discovery failed: {e}")
 
 # --- THE GOLDEN SCHEDULE (EST/PST friendly) ---
-# 10:00 AM
-scheduler.add_job(job_upload_next_video, 'cron', hour=10, minute=0)
-# 2:00 PM
-scheduler.add_job(job_upload_next_video, 'cron', hour=14, minute=0)
-# 6:00 PM
-scheduler.add_job(job_upload_next_video, 'cron', hour=18, minute=0)
+# 10:00 AM, 2:00 PM, 6:00 PM (also what encode profiles plan around)
+for slot_hour in UPLOAD_SLOT_HOURS:
+    scheduler.add_job(job_upload_next_video, 'cron', hour=slot_hour, minute=0)
 
 # Optimization runs at Midnight
 scheduler.add_job(job_optimize_hashtags, 'cron', hour=0, minute=0)
@@ -0,0 +1,129 @@
+import math
+import multiprocessing
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .asset_cache import prepare_layers
+from .audio_engine import mix_cues, write_wav
+from .encode_profiles import DEFAULT_ENCODE_PROFILE
+from .ffmpeg_tools import FFMPEG_BINARY
+from .matte_cache import get_matte
+from .render_farm import farm_size, init_render_worker
+
+# Shorter segments cost more in process startup than they save.
+SEGMENT_MIN_SECONDS = 4.0
+
+
+def segment_bounds(duration, fps, segments):
+    """
+    [(t0, t1), ...] covering [0, duration) in `segments` pieces, cut on
+    frame boundaries so every segment starts on its own keyframe.
+    """
+    frames = int(round(duration * fps))
+    cuts = [int(round(frames * k / segments)) for k in range(segments + 1)]
+    return [(a / fps, b / fps) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def slice_plan(plan, t0, t1):
+    """
+    Video-only copy of a plan covering [t0, t1), rebased to start at 0.
+    Layers crossing a cut keep their remaining part, with source offsets
+    (and green-screen matte offsets) advanced by the part already shown.
+    """
+    layers = []
+    for layer in plan["layers"]:
+        start, end = layer["start"], layer["start"] + layer["duration"]
+        if end <= t0 or start >= t1:
+            continue
+        cut_in = max(start, t0)
+        part = dict(layer, start=cut_in - t0, duration=min(end, t1) - cut_in)
+        if layer["kind"] == "video":
+            part["src_start"] = layer["src_start"] + (cut_in - start)
+            if layer.get("chroma_key"):
+                part["key_trim"] = layer.get("key_trim", layer["src_start"])
+                part["key_duration"] = layer.get("key_duration", layer["duration"])
+        layers.append(part)
+    return dict(plan, duration=t1 - t0, layers=layers, audio=[])
+
+
+def _warm_caches(plan, backend):
+    # Key mattes once here instead of racing to key them in every worker.
+    # The ffmpeg backend keys with colorkey and never reads them.
+    if backend == "ffmpeg":
+        return
+    for layer in plan["layers"]:
+        if layer.get("chroma_key"):
+            get_matte(layer["path"], layer["chroma_key"], trim=layer["src_start"], duration=layer["duration"])
+
+
+def _render_segment(plan, output_path, backend, profile):
+    from .editor_engine import render_plan
+    render_plan(plan, output_path, backend=backend, profile=profile)
+    return output_path
+
+
+def _concat(segment_paths, audio_path, duration, output_path, work_dir):
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    cmd = [FFMPEG_BINARY, "-y", "-v", "error", "-nostdin", "-f", "concat", "-safe", "0", "-i", list_path]
+    maps = ["-map", "0:v"]
+    if audio_path:
+        cmd += ["-i", audio_path]
+        maps += ["-map", "1:a"]
+    cmd += maps + ["-c:v", "copy", "-c:a", "aac", "-t", f"{duration:.3f}", "-movflags", "+faststart", output_path]
+
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg concat failed for {output_path}: {proc.stderr.decode(errors='ignore')[-500:]}")
+
+
+def render_segmented(plan, output_path, segments=None, backend=None, profile=DEFAULT_ENCODE_PROFILE):
+    """
+    Render one plan as N video-only segments in parallel processes, join
+    them with the concat demuxer (no re-encode) and mux the whole-timeline
+    audio mix once, so cues spanning a cut (jumpscare, adlib) stay intact.
+    Every segment uses the same encode profile so the streams concat.
+    """
+    workers, _ = farm_size()
+    if segments is None:
+        segments = min(workers, max(1, int(math.floor(plan["duration"] / SEGMENT_MIN_SECONDS))))
+    plan = prepare_layers(plan)
+
+    if segments <= 1:
+        from .editor_engine import render_plan
+        render_plan(plan, output_path, backend=backend, profile=profile)
+        return
+
+    from .editor_engine import RENDER_BACKEND
+    _warm_caches(plan, backend or RENDER_BACKEND)
+    bounds = segment_bounds(plan["duration"], plan["fps"], segments)
+    pool_size = min(workers, len(bounds))
+    # Split the cores between however many segments actually run at once.
+    threads = max(1, (os.cpu_count() or 1) // pool_size)
+    print(f"[SEGMENTS] {len(bounds)} segments on {pool_size} workers x {threads} threads -> {output_path}")
+
+    with tempfile.TemporaryDirectory(prefix="segments_") as work_dir:
+        paths = [os.path.join(work_dir, f"seg_{i:03d}.mp4") for i in range(len(bounds))]
+        with ProcessPoolExecutor(
+            max_workers=pool_size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_render_worker,
+            initargs=(threads,),
+        ) as pool:
+            futures = [
+                pool.submit(_render_segment, slice_plan(plan, t0, t1), path, backend, profile)
+                for (t0, t1), path in zip(bounds, paths)
+            ]
+            for future in futures:
+                future.result()
+
+        audio_path = None
+        if plan["audio"]:
+            audio_path = os.path.join(work_dir, "mix.wav")
+            write_wav(mix_cues(plan["audio"], plan["duration"]), audio_path)
+        _concat(paths, audio_path, plan["duration"], output_path, work_dir)
@@ -8,6 +8,7 @@ from scripts.ai_engine import generate_roast
 from scripts.tts_engine import generate_audio
 from scripts.editor_engine import apply_chaos
 from scripts.db_engine import add_video_to_queue
+from scripts.media_pool import media_stats
 from scripts.scheduler import scheduler 
 
 app = FastAPI()
@@ -52,6 +53,11 @@ async def home():
     </html>
     """
 
+@app.get("/stats")
+async def stats():
+    # Live editor readers + process RSS; both should stay flat across renders.
+    return media_stats()
+
 @app.post("/upload")
 async def process_upload(streamer: str = Form(...), persona: str = Form(...), file: UploadFile = File(...)):
     # 1. Save Raw File
@@ -83,7 +89,8 @@ async def process_upload(streamer: str = Form(...), persona: str = Form(...), fi
         
     # Editor
     valid_tts = [f for f in tts_files if f]
-    apply_chaos(raw_path, ai_data, valid_tts, output_path)
+    # Single upload: split the render across cores instead of one serial encode.
+    apply_chaos(raw_path, ai_data, valid_tts, output_path, segmented=True)
     
     # --- AUTO-DELETE INPUT ---
     # We are done with the raw video. Delete it to save space.
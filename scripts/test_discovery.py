@@ -1,5 +1,5 @@
 import argparse
-from .discovery_engine import discover_and_queue
+from .discovery_engine import discover_and_queue, DISCOVERY_CONCURRENCY
 from .config import DISCOVERY_TARGET_COUNT
 
 
@@ -8,6 +8,15 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Only list candidates.")
     parser.add_argument("--no-produce", action="store_true", help="Download without editing/queueing.")
     parser.add_argument("--count", type=int, default=None, help="Override target count.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DISCOVERY_CONCURRENCY,
+        help="Parallel Helix lookups (1 = sequential).",
+    )
+    parser.add_argument("--no-pipeline", action="store_true", help="Produce clips one at a time.")
+    parser.add_argument("--no-rank", action="store_true", help="Take the first clips found instead of ranking.")
+    parser.add_argument("--no-farm", action="store_true", help="Render in-process instead of in a render farm.")
     args = parser.parse_args()
 
     target_count = args.count if args.count is not None else DISCOVERY_TARGET_COUNT
@@ -15,6 +24,10 @@ def main():
         dry_run=args.dry_run,
         produce=not args.no_produce,
         target_count=target_count,
+        concurrency=args.concurrency,
+        pipeline=not args.no_pipeline,
+        rank=not args.no_rank,
+        render_farm=not args.no_farm,
     )
 
     print("\n--- DISCOVERY RESULTS ---")
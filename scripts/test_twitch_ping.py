@@ -1,42 +1,18 @@
-import requests
-
 from .config import (
-    TWITCH_CLIENT_ID,
-    TWITCH_CLIENT_SECRET,
     TWITCH_FOLLOWER_MAX,
     TWITCH_STREAMS_PAGES,
     TWITCH_STREAMS_PER_PAGE,
 )
-
-
-def _get_token():
-    token_url = "https://id.twitch.tv/oauth2/token"
-    params = {
-        "client_id": TWITCH_CLIENT_ID,
-        "client_secret": TWITCH_CLIENT_SECRET,
-        "grant_type": "client_credentials",
-    }
-    res = requests.post(token_url, params=params, timeout=10)
-    res.raise_for_status()
-    return res.json().get("access_token")
-
-
-def _headers(token):
-    return {
-        "Client-ID": TWITCH_CLIENT_ID,
-        "Authorization": f"Bearer {token}",
-    }
+from .twitch_client import get_twitch_client
 
 
 def main():
     print("--- TWITCH PING ---")
-    token = _get_token()
-    if not token:
+    client = get_twitch_client()
+    if not client.get_token():
         print("Failed to obtain token.")
         return
 
-    headers = _headers(token)
-    streams_url = "https://api.twitch.tv/helix/streams"
     checked = 0
     under_threshold = 0
     total_streams = 0
@@ -46,7 +22,7 @@ def main():
         params = {"first": min(TWITCH_STREAMS_PER_PAGE, 100)}
         if after:
             params["after"] = after
-        streams_res = requests.get(streams_url, headers=headers, params=params, timeout=10)
+        streams_res = client.get("streams", params=params)
         streams_res.raise_for_status()
         payload = streams_res.json()
         streams = payload.get("data", [])
@@ -59,12 +35,9 @@ def main():
             broadcaster_name = stream.get("user_name")
             if not broadcaster_id:
                 continue
-            followers_url = "https://api.twitch.tv/helix/channels/followers"
-            followers_res = requests.get(
-                followers_url,
-                headers=headers,
+            followers_res = client.get(
+                "channels/followers",
                 params={"broadcaster_id": broadcaster_id, "first": 1},
-                timeout=10,
             )
             if followers_res.status_code != 200:
                 continue
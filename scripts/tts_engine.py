@@ -16,8 +16,10 @@ VOICE_POOL = {
     ],
 }
 
-async def generate_audio(text, index, persona="NIGERIAN"):
-    filename = os.path.join(TEMP_DIR, f"line_{index}.mp3")
+async def generate_audio(text, index, persona="NIGERIAN", prefix=None):
+    # prefix keeps files unique when several clips are voiced at once
+    name = f"{prefix}_line_{index}.mp3" if prefix else f"line_{index}.mp3"
+    filename = os.path.join(TEMP_DIR, name)
     text = text.replace("*", "") 
     
     persona_key = "ZESTY" if persona == "ZESTY" else "NIGERIAN"
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import TWITCH_CLIENT_ID, TWITCH_CLIENT_SECRET
+
+TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+HELIX_URL = "https://api.twitch.tv/helix"
+
+# Refresh the app token this many seconds before Twitch says it expires.
+TOKEN_EXPIRY_MARGIN = 300
+# Once the Helix bucket drops to this many points, wait for the reset.
+RATELIMIT_LOW_WATER = 5
+# Keep-alive connections kept open to api.twitch.tv.
+POOL_SIZE = 16
+
+
+class TwitchClient:
+    """
+    Helix client shared by discovery and the ping script.
+    Caches the app access token, reuses pooled connections and paces
+    itself from the Ratelimit-* headers instead of running into 429s.
+    """
+
+    def __init__(self, client_id=TWITCH_CLIENT_ID, client_secret=TWITCH_CLIENT_SECRET, pool_size=POOL_SIZE):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+
+        self._remaining = None
+        self._reset_at = 0.0
+        self._rate_lock = threading.Lock()
+
+    def has_credentials(self):
+        return bool(self.client_id and self.client_secret)
+
+    def get_token(self, force=False):
+        if not self.has_credentials():
+            return None
+        with self._token_lock:
+            if not force and self._token and time.time() < self._token_expires_at:
+                return self._token
+
+            params = {
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "client_credentials",
+            }
+            res = self.session.post(TOKEN_URL, params=params, timeout=10)
+            if res.status_code != 200:
+                print(f"Twitch auth failed: {res.status_code} {res.text}")
+                self._token = None
+                return None
+
+            data = res.json()
+            expires_in = int(data.get("expires_in", 3600))
+            self._token = data.get("access_token")
+            self._token_expires_at = time.time() + max(0, expires_in - TOKEN_EXPIRY_MARGIN)
+            return self._token
+
+    def _invalidate_token(self, token):
+        with self._token_lock:
+            if self._token == token:
+                self._token = None
+                self._token_expires_at = 0.0
+
+    def headers(self, token=None):
+        token = token or self.get_token()
+        return {
+            "Client-ID": self.client_id,
+            "Authorization": f"Bearer {token}",
+        }
+
+    def _wait_for_budget(self):
+        # Held while sleeping so every thread queues behind the reset.
+        with self._rate_lock:
+            if self._remaining is not None and self._remaining <= RATELIMIT_LOW_WATER:
+                delay = self._reset_at - time.time()
+                if delay > 0:
+                    print(f"  [TWITCH] Rate limit low ({self._remaining} left), waiting {delay:.1f}s")
+                    time.sleep(delay)
+                self._remaining = None
+            elif self._remaining is not None:
+                self._remaining -= 1
+
+    def _record_limits(self, res):
+        remaining = res.headers.get("Ratelimit-Remaining")
+        reset = res.headers.get("Ratelimit-Reset")
+        with self._rate_lock:
+            try:
+                if remaining is not None:
+                    self._remaining = int(remaining)
+                if reset is not None:
+                    self._reset_at = float(reset)
+            except ValueError:
+                pass
+
+    def get(self, path, params=None, timeout=10, retries=3):
+        """
+        GET a Helix endpoint ("streams", "channels/followers", ... or a full URL).
+        Returns the requests.Response, or None without credentials.
+        """
+        url = path if path.startswith("http") else f"{HELIX_URL}/{path.lstrip('/')}"
+        res = None
+        for attempt in range(retries + 1):
+            token = self.get_token()
+            if not token:
+                return None
+
+            self._wait_for_budget()
+            res = self.session.get(url, headers=self.headers(token), params=params, timeout=timeout)
+            self._record_limits(res)
+
+            if attempt >= retries:
+                break
+            if res.status_code == 401:
+                self._invalidate_token(token)
+                continue
+            if res.status_code == 429:
+                delay = max(1.0, self._reset_at - time.time())
+                print(f"  [TWITCH] 429 received, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            break
+        return res
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_twitch_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TwitchClient()
+        return _client
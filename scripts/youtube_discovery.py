@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from .config import TEMP_DIR, YOUTUBE_DATA_API_KEY, YOUTUBE_SHORTS_MAX_SECONDS
+from .db_engine import get_recently_used_creator_ids, get_used_clip_ids
+
+YOUTUBE_CACHE_DIR = os.path.join(TEMP_DIR, "youtube_cache")
+
+# How long cached responses are served without touching the API at all.
+YOUTUBE_CACHE_TTL_HOURS = {
+    "search": 6,
+    "videos": 12,
+    "channels": 24,
+}
+
+# Data API v3 quota cost per call.
+QUOTA_COST = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+}
+
+# videos.list / channels.list accept up to 50 ids per call.
+BATCH_SIZE = 50
+# Creator names OR-ed into one search (q="a|b|c"). 1 = one search per creator.
+SEARCH_QUERIES_PER_CALL = 5
+
+
+def _parse_iso8601_duration(duration_str):
+    """
+    Parse ISO 8601 durations like PT1M2S into seconds.
+    """
+    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", duration_str)
+    if not match:
+        return None
+    hours = int(match.group(1) or 0)
+    minutes = int(match.group(2) or 0)
+    seconds = int(match.group(3) or 0)
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _published_after(item, cutoff):
+    published = item.get("snippet", {}).get("publishedAt")
+    if not published:
+        return False
+    try:
+        return datetime.fromisoformat(published.replace("Z", "+00:00")) >= cutoff
+    except ValueError:
+        return False
+
+
+class YouTubeDiscovery:
+    """
+    Quota-lean YouTube Shorts discovery.
+    Searches are OR-batched across creators, video/channel lookups are
+    merged into 50-id calls, and every response is cached on disk with a
+    TTL (per item for videos/channels, per query for search). Expired
+    search entries are revalidated with If-None-Match; batched lookups
+    have no stable request to revalidate, so they are just refetched.
+    Units spent are tracked per run.
+    """
+
+    def __init__(self, api_key=YOUTUBE_DATA_API_KEY, cache_dir=YOUTUBE_CACHE_DIR, ttl_hours=None):
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.ttl_hours = dict(YOUTUBE_CACHE_TTL_HOURS, **(ttl_hours or {}))
+        self.youtube = build("youtube", "v3", developerKey=api_key) if api_key else None
+        self.units_spent = 0
+        self.calls = Counter()
+        self.cache_hits = Counter()
+        self.not_modified = Counter()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # --- disk cache ---
+
+    def _cache_path(self, kind, key):
+        digest = hashlib.sha1(json.dumps([kind, key], sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{kind}_{digest}.json")
+
+    def _cache_load(self, kind, key):
+        path = self._cache_path(kind, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_store(self, kind, key, body, etag=None):
+        path = self._cache_path(kind, key)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": time.time(), "etag": etag, "body": body}, f)
+        os.replace(tmp, path)
+
+    def _is_fresh(self, kind, entry):
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl_hours[kind] * 3600
+
+    def _execute(self, kind, request, cached=None):
+        if cached and cached.get("etag"):
+            request.headers["If-None-Match"] = cached["etag"]
+        self.units_spent += QUOTA_COST[kind]
+        self.calls[kind] += 1
+        try:
+            return request.execute()
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                self.not_modified[kind] += 1
+                return cached["body"]
+            raise
+
+    # --- API wrappers ---
+
+    def search_shorts(self, query, lookback_hours):
+        """
+        Returns recent short video ids for query (a plain or "a|b|c" OR query).
+        """
+        # The lookback is applied to the (date-ordered) results rather than
+        # sent as publishedAfter, so the request, cache key and ETag stay the
+        # same between runs.
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=lookback_hours)
+        params = {
+            "part": "snippet",
+            "type": "video",
+            "order": "date",
+            "q": query if query else "shorts",
+            "videoDuration": "short",
+            "maxResults": 50 if "|" in (query or "") else 25,
+        }
+        cached = self._cache_load("search", params)
+        if self._is_fresh("search", cached):
+            self.cache_hits["search"] += 1
+            body = cached["body"]
+        else:
+            try:
+                body = self._execute("search", self.youtube.search().list(**params), cached)
+            except HttpError as e:
+                print(f"[WARN] YouTube search failed: {e}")
+                return []
+            self._cache_store("search", params, body, etag=body.get("etag"))
+        return [
+            item["id"]["videoId"] for item in body.get("items", [])
+            if item.get("id", {}).get("videoId") and _published_after(item, cutoff)
+        ]
+
+    def _batched_lookup(self, kind, ids, part):
+        """
+        Fetch items by id, serving fresh ones from the per-item cache and
+        merging the rest into 50-id calls.
+        """
+        items = {}
+        missing = []
+        for item_id in dict.fromkeys(ids):
+            cached = self._cache_load(kind, [part, item_id])
+            if self._is_fresh(kind, cached):
+                self.cache_hits[kind] += 1
+                if cached["body"]:
+                    items[item_id] = cached["body"]
+            else:
+                missing.append(item_id)
+
+        endpoint = self.youtube.videos() if kind == "videos" else self.youtube.channels()
+        for i in range(0, len(missing), BATCH_SIZE):
+            batch = missing[i:i + BATCH_SIZE]
+            try:
+                res = self._execute(kind, endpoint.list(part=part, id=",".join(batch), maxResults=BATCH_SIZE))
+            except HttpError as e:
+                print(f"[WARN] YouTube {kind} lookup failed: {e}")
+                continue
+            found = {item["id"]: item for item in res.get("items", [])}
+            for item_id in batch:
+                item = found.get(item_id)
+                # Cache misses too, so deleted/private ids aren't re-requested.
+                self._cache_store(kind, [part, item_id], item)
+                if item:
+                    items[item_id] = item
+        return items
+
+    def get_videos(self, video_ids):
+        return self._batched_lookup("videos", video_ids, "contentDetails,snippet,statistics")
+
+    def get_subscriber_counts(self, channel_ids):
+        subs = {}
+        for channel_id, item in self._batched_lookup("channels", channel_ids, "statistics").items():
+            try:
+                subs[channel_id] = int(item["statistics"].get("subscriberCount", 0))
+            except Exception:
+                subs[channel_id] = 0
+        return subs
+
+    # --- discovery ---
+
+    def discover(self, queries, lookback_hours, sub_max, unique_days):
+        """
+        Returns {query: [candidate, ...]} for every query, spending one
+        search per SEARCH_QUERIES_PER_CALL queries and shared 50-id
+        video/channel lookups across all of them.
+        """
+        results = {q: [] for q in queries}
+        if not self.youtube:
+            print("YouTube Data API key missing; skipping YouTube discovery.")
+            return results
+
+        step = max(1, SEARCH_QUERIES_PER_CALL)
+        queries = list(queries)
+        video_ids = []
+        for i in range(0, len(queries), step):
+            group = [q for q in queries[i:i + step] if q]
+            combined = "|".join(group) if group else None
+            video_ids.extend(self.search_shorts(combined, lookback_hours))
+        if not video_ids:
+            return results
+
+        videos = self.get_videos(video_ids)
+        candidates = []
+        for item in videos.values():
+            duration = _parse_iso8601_duration(item["contentDetails"]["duration"])
+            if duration is None or duration > YOUTUBE_SHORTS_MAX_SECONDS:
+                continue
+            candidates.append({
+                "platform": "youtube",
+                "clip_id": item["id"],
+                "clip_url": f"https://www.youtube.com/watch?v={item['id']}",
+                "creator_id": item["snippet"]["channelId"],
+                "creator_name": item["snippet"]["channelTitle"],
+                "title": item["snippet"]["title"],
+                # Ranking inputs (follower_total is filled in from channel stats)
+                "view_count": int(item.get("statistics", {}).get("viewCount", 0) or 0),
+                "created_at": item["snippet"].get("publishedAt"),
+                "duration": duration,
+                "viewer_count": 0,
+            })
+        if not candidates:
+            return results
+
+        subs_by_channel = self.get_subscriber_counts({c["creator_id"] for c in candidates})
+        used_creators = get_recently_used_creator_ids(
+            "youtube", [c["creator_id"] for c in candidates], within_days=unique_days
+        )
+        used_clips = get_used_clip_ids("youtube", [c["clip_id"] for c in candidates])
+
+        for c in candidates:
+            c["follower_total"] = subs_by_channel.get(c["creator_id"], 0)
+            if c["follower_total"] >= sub_max:
+                continue
+            if c["creator_id"] in used_creators or c["clip_id"] in used_clips:
+                continue
+            for q in results:
+                if not q or q.lower() in c["creator_name"].lower():
+                    results[q].append(c)
+        return results
+
+    def report(self):
+        calls = ", ".join(f"{k}={v}" for k, v in sorted(self.calls.items())) or "none"
+        hits = sum(self.cache_hits.values())
+        revalidated = sum(self.not_modified.values())
+        print(f"[YOUTUBE] Quota units spent: {self.units_spent} (calls: {calls}; cache hits: {hits}; 304s: {revalidated})")